@@ -75,12 +75,31 @@ def safe_series_divide(
     return (numerator / denominator.replace(0, np.nan)).fillna(default)
 
 
+# Leaf types that are already JSON-native and need no conversion
+_JSON_NATIVE = (str, int, bool, type(None))
+
+
 def sanitize_for_json(obj):
     """Recursively convert numpy/pandas types to native Python for JSON serialization."""
     import math
+    # Fast paths: report payloads are mostly plain float/str/int leaves and str keys
+    t = type(obj)
+    if t in _JSON_NATIVE:
+        return obj
+    if t is float:
+        return obj if math.isfinite(obj) else 0.0
     if isinstance(obj, dict):
         clean = {}
         for k, v in obj.items():
+            if type(k) is str:
+                tv = type(v)
+                if tv in _JSON_NATIVE:
+                    clean[k] = v
+                elif tv is float:
+                    clean[k] = v if math.isfinite(v) else 0.0
+                else:
+                    clean[k] = sanitize_for_json(v)
+                continue
             # Sanitize keys: skip NaN/None keys, convert non-string keys to str
             if k is None:
                 continue
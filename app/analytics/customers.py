@@ -7,7 +7,7 @@ import numpy as np
 import pandas as pd
 
 from app.analytics.common import safe_divide, fillna_numeric, calc_discount_rate, calc_discount_rate_series
-from app.data.normalize import get_customer_segment
+from app.data.normalize import get_customer_segments
 
 
 def customer_metrics(
@@ -48,7 +48,7 @@ def customer_metrics(
         cust["groups"] = ""
         cust["is_loyal"] = "No"
 
-    cust["segment"] = cust["groups"].apply(get_customer_segment)
+    cust["segment"] = get_customer_segments(cust["groups"])
     return cust
 
 
@@ -0,0 +1,89 @@
+"""
+ASGI middleware: transparent gzip request-body decoding for uploads.
+
+Clients may send `Content-Encoding: gzip` on upload requests; the body is
+inflated incrementally as it arrives, so handlers see a plain multipart
+stream and the compressed payload is never buffered in full. Corrupt or
+truncated bodies are rejected with 400, oversized ones with 413.
+"""
+from __future__ import annotations
+
+from fastapi import HTTPException
+
+try:
+    from isal import isal_zlib as _zlib
+except ImportError:
+    import zlib as _zlib
+
+
+class GzipRequestMiddleware:
+    """Inflate gzip-encoded request bodies for paths under `path_prefix`."""
+
+    def __init__(self, app, path_prefix: str = "/api/upload", max_size: int = 512 * 1024 * 1024) -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+        # Cap on the inflated body, so a small gzip bomb can't exhaust memory
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_advertising(message):
+            # Tell clients this endpoint accepts gzip-encoded bodies
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"accept-encoding", b"gzip")]}
+            await send(message)
+
+        encoding = b""
+        for k, v in scope["headers"]:
+            if k == b"content-encoding":
+                encoding = v.strip().lower()
+        if encoding != b"gzip":
+            await self.app(scope, receive, send_advertising)
+            return
+
+        # Decoded length is unknown up front — drop both headers
+        scope = {
+            **scope,
+            "headers": [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")],
+        }
+        max_size = self.max_size
+        inflater = None
+        inflated = 0
+
+        async def inflating_receive():
+            nonlocal inflater, inflated
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            data = message.get("body", b"")
+            out = bytearray()
+            try:
+                while data:
+                    if inflater is None:
+                        inflater = _zlib.decompressobj(wbits=31)
+                    elif inflater.eof:
+                        # Concatenated gzip members; zero padding after a
+                        # member is skipped, as gzip.decompress does
+                        data = data.lstrip(b"\0")
+                        if not data:
+                            break
+                        inflater = _zlib.decompressobj(wbits=31)
+                    # One byte past the budget is enough to tell it was exceeded
+                    chunk = inflater.decompress(data, max_size - inflated + 1)
+                    inflated += len(chunk)
+                    if inflated > max_size:
+                        raise HTTPException(413, f"Decompressed upload exceeds {max_size:,} bytes")
+                    out += chunk
+                    # Whatever followed a finished member; empty mid-member
+                    data = inflater.unused_data
+            except _zlib.error as e:
+                raise HTTPException(400, f"Invalid gzip body ({e})")
+            more = message.get("more_body", False)
+            if not more and inflater is not None and not inflater.eof:
+                raise HTTPException(400, "Truncated gzip body")
+            return {"type": "http.request", "body": bytes(out), "more_body": more}
+
+        await self.app(scope, inflating_receive, send_advertising)
@@ -5,9 +5,11 @@ Reload lives in router_meta.py.
 """
 from __future__ import annotations
 
-import gzip
+import asyncio
+import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -15,11 +17,53 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 
 from app.config import INBOX_FOLDER, UPLOADS_FOLDER
 
+# ISA-L's inflate is 2-4x faster than stock zlib on x86_64; same API, optional
+try:
+    from isal import isal_zlib as _zlib
+except ImportError:
+    import zlib as _zlib
+
 router = APIRouter(prefix="/api", tags=["upload"])
 
 # Temp directory for chunked uploads
 CHUNKS_DIR = UPLOADS_FOLDER / "_chunks"
 
+# Resolved once — every path check compares against this canonical root
+_INBOX_RESOLVED = INBOX_FOLDER.resolve()
+
+_INFLATE_BLOCK = 1 << 20
+
+# Dedicated pool for upload disk IO so a burst of uploads can't starve the
+# default executor used elsewhere in the app
+_IO_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="upload-io",
+)
+
+
+async def _run_io(fn, *args):
+    """Run a blocking call on the upload IO pool."""
+    return await asyncio.get_running_loop().run_in_executor(_IO_POOL, fn, *args)
+
+
+def _gunzip(content: bytes) -> bytes:
+    """Decompress a (possibly multi-member) gzip payload in 1 MB blocks."""
+    out = bytearray()
+    src = memoryview(content)
+    while src:
+        d = _zlib.decompressobj(wbits=31)
+        pos = 0
+        while pos < len(src) and not d.eof:
+            out += d.decompress(src[pos:pos + _INFLATE_BLOCK])
+            pos += _INFLATE_BLOCK
+        out += d.flush()
+        if not d.eof:
+            raise ValueError("Truncated gzip upload")
+        # Concatenated gzip members: keep going on whatever follows this one.
+        # Zero padding after a member is skipped, as gzip.decompress does.
+        src = memoryview((d.unused_data + src[pos:].tobytes()).lstrip(b"\0"))
+    return bytes(out)
+
 
 def _resolve_year_folder(filename: str) -> Path:
     """Determine which year subfolder to save a CSV into based on filename dates."""
@@ -28,6 +72,26 @@ def _resolve_year_folder(filename: str) -> Path:
     return INBOX_FOLDER / year
 
 
+def _inbox_dest(filename: str) -> Path:
+    """Destination path for an uploaded CSV; rejects names that escape the inbox."""
+    dest = _resolve_year_folder(filename) / filename
+    if not dest.resolve().is_relative_to(_INBOX_RESOLVED):
+        raise HTTPException(400, "Invalid file path")
+    return dest
+
+
+def _assemble_chunks(chunk_dir: Path, dest: Path, total_chunks: int) -> int:
+    """Concatenate chunk files into dest, remove the chunk dir, return final size."""
+    with open(dest, "wb") as out:
+        for i in range(total_chunks):
+            cp = chunk_dir / f"chunk_{i:04d}"
+            out.write(cp.read_bytes())
+
+    # Clean up chunks
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    return dest.stat().st_size
+
+
 @router.post("/upload")
 async def upload_csvs(files: list[UploadFile] = File(...)):
     """Upload one or more CSV files to the inbox."""
@@ -45,14 +109,15 @@ async def upload_csvs(files: list[UploadFile] = File(...)):
         if not filename.lower().endswith(".csv"):
             raise HTTPException(400, f"Only .csv files are accepted (got '{f.filename}')")
 
-        dest_dir = _resolve_year_folder(filename)
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest = dest_dir / filename
+        dest = _inbox_dest(filename)
+        dest.parent.mkdir(parents=True, exist_ok=True)
 
+        # Disk writes and inflate run in a worker thread so slow volumes
+        # don't stall the event loop for other requests
         content = await f.read()
         if is_gzipped:
-            content = gzip.decompress(content)
-        dest.write_bytes(content)
+            content = await _run_io(_gunzip, content)
+        await _run_io(dest.write_bytes, content)
         saved.append({"name": filename, "path": str(dest.relative_to(INBOX_FOLDER)), "size": len(content)})
 
     return {"status": "uploaded", "count": len(saved), "files": saved}
@@ -74,25 +139,16 @@ async def upload_chunk(
     # Save this chunk
     chunk_path = chunk_dir / f"chunk_{chunk_index:04d}"
     content = await file.read()
-    chunk_path.write_bytes(content)
+    await _run_io(chunk_path.write_bytes, content)
 
     # Check if all chunks are present
     existing = list(chunk_dir.glob("chunk_*"))
     if len(existing) >= total_chunks:
         # Assemble the file
-        dest_dir = _resolve_year_folder(filename)
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest = dest_dir / filename
-
-        with open(dest, "wb") as out:
-            for i in range(total_chunks):
-                cp = chunk_dir / f"chunk_{i:04d}"
-                out.write(cp.read_bytes())
+        dest = _inbox_dest(filename)
+        dest.parent.mkdir(parents=True, exist_ok=True)
 
-        # Clean up chunks
-        shutil.rmtree(chunk_dir, ignore_errors=True)
-
-        size = dest.stat().st_size
+        size = await _run_io(_assemble_chunks, chunk_dir, dest, total_chunks)
         return {
             "status": "complete",
             "name": filename,
@@ -103,19 +159,50 @@ async def upload_chunk(
     return {"status": "chunked", "received": len(existing), "total": total_chunks}
 
 
+# Inboxes at least this large stat their files concurrently on _IO_POOL
+_STAT_BATCH_MIN = 64
+
+
+def _walk_csvs(root: str):
+    """Yield DirEntry objects for every *.csv under root (recursive)."""
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                # Symlinked directories are not walked, same as rglob and the loader
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".csv"):
+                    yield entry
+
+
 @router.get("/upload/files")
 def list_files():
     """List all CSV files in the inbox with sizes."""
     files = []
     if INBOX_FOLDER.exists():
-        for csv_file in sorted(INBOX_FOLDER.rglob("*.csv")):
-            stat = csv_file.stat()
+        inbox_str = str(INBOX_FOLDER)
+        prefix_len = len(inbox_str) + 1
+        fromtimestamp = datetime.fromtimestamp
+        entries = list(_walk_csvs(inbox_str))
+        if len(entries) >= _STAT_BATCH_MIN:
+            # Overlap the stat round-trips — on network volumes these dominate
+            stats = list(_IO_POOL.map(os.stat, [e.path for e in entries]))
+        else:
+            stats = [e.stat() for e in entries]
+        for entry, stat in zip(entries, stats):
             files.append({
-                "name": csv_file.name,
-                "path": str(csv_file.relative_to(INBOX_FOLDER)),
+                "name": entry.name,
+                "path": entry.path[prefix_len:],
                 "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "modified": fromtimestamp(stat.st_mtime).isoformat(),
             })
+        # Same order as sorted(Path.rglob()): component-wise path comparison
+        files.sort(key=lambda f: f["path"].split(os.sep))
     return {"files": files, "count": len(files), "inbox_path": str(INBOX_FOLDER)}
 
 
@@ -124,7 +211,7 @@ def delete_file(filename: str):
     """Delete a specific CSV file from the inbox."""
     target = (INBOX_FOLDER / filename).resolve()
     # Ensure the target is actually inside INBOX_FOLDER
-    if not str(target).startswith(str(INBOX_FOLDER.resolve())):
+    if not target.is_relative_to(_INBOX_RESOLVED):
         raise HTTPException(400, "Invalid file path")
     if not target.exists():
         raise HTTPException(404, f"File not found: {filename}")
@@ -21,21 +21,51 @@ USAGE:
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib
 import json
 import os
+import queue
 import re
 import shutil
 import sys
+import threading
 import unicodedata
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
-# Ensure project root is on path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# orjson encodes 3-10x faster than stdlib json; optional, same output shape
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-from app.config import BASE_FOLDER, BRAND_REPORTS_FOLDER, REPORTS_FOLDER
-from app.data.store import DataStore
-from app.data.schemas import PeriodFilter, PeriodType
+# `python -m app.cli` already has the project root on sys.path; only a direct
+# `python app/cli.py` run needs it added (abspath, no filesystem round-trip)
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.config / app.data / app.reports are imported inside the subcommands so
+# that --help, argument errors and `serve` never pay for pandas/openpyxl.
+
+
+def _int_in_range(name: str, lo: int, hi: int):
+    """argparse type= converter: int within [lo, hi], rejected before any data loads."""
+    def convert(value: str) -> int:
+        try:
+            n = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"{name} must be an integer (got '{value}')")
+        if not lo <= n <= hi:
+            raise argparse.ArgumentTypeError(f"{name} must be {lo}-{hi} (got {n})")
+        return n
+    return convert
+
+
+_YEAR = _int_in_range("year", 2000, 2100)
+_MONTH = _int_in_range("month", 1, 12)
+_QUARTER = _int_in_range("quarter", 1, 4)
 
 
 def _build_period(args) -> PeriodFilter | None:
@@ -43,6 +73,7 @@ def _build_period(args) -> PeriodFilter | None:
     pt = getattr(args, "period", None)
     if pt is None:
         return None
+    from app.data.schemas import PeriodFilter, PeriodType
     return PeriodFilter(
         period_type=PeriodType(pt),
         year=getattr(args, "year", None),
@@ -53,34 +84,39 @@ def _build_period(args) -> PeriodFilter | None:
 
 def cmd_brand(args):
     """Generate brand reports."""
+    from app.config import BRAND_REPORTS_FOLDER
+    from app.data.store import DataStore
+
     print("\n" + "=" * 70)
     print("  THRIVE ANALYTICS — BRAND REPORT GENERATOR")
     print("=" * 70)
 
-    store = DataStore().load()
     period = _build_period(args)
+    store = DataStore().load()
     date_range = store.date_range(period)
     brands = store.brands()
+    # First spelling wins when two brands differ only by case (matches the old linear scan)
+    brand_by_upper = {}
+    for b in brands:
+        brand_by_upper.setdefault(b.upper(), b)
 
     if args.list:
         regular = store.get_regular(period)
-        brand_rev = regular.groupby("brand_clean", observed=True)["actual_revenue"].sum().sort_values(ascending=False)
+        brand_rev = regular.groupby("brand_clean", observed=True)["actual_revenue"].sum()
         print(f"\nBRANDS ({len(brand_rev)}):\n")
-        for i, (b, rev) in enumerate(brand_rev.items(), 1):
-            print(f"{i:<4}{b[:40]:<42}${rev:>12,.2f}")
-            if i >= 50:
-                break
+        # Only the top 50 are shown — partial selection instead of a full sort
+        lines = [f"{i:<4}{b[:40]:<42}${rev:>12,.2f}" for i, (b, rev) in enumerate(brand_rev.nlargest(50).items(), 1)]
+        if lines:
+            print("\n".join(lines))
         return
 
-    # Determine which brands to process
+    # Determine which brands to process — resolved to canonical names once, here
     brands_to_process = []
     if args.top:
         brands_to_process = brands[:args.top]
-    elif args.facing:
-        brands_to_process = args.facing
-    elif args.brands:
-        for req in args.brands:
-            match = next((b for b in brands if b.upper() == req.upper()), None)
+    elif args.facing or args.brands:
+        for req in args.facing or args.brands:
+            match = brand_by_upper.get(req.upper())
             if match:
                 brands_to_process.append(match)
             else:
@@ -91,109 +127,335 @@ def cmd_brand(args):
 
     BRAND_REPORTS_FOLDER.mkdir(parents=True, exist_ok=True)
 
+    # Each brand's workbook is independent; a brand named twice is built once
+    brands_to_process = list(dict.fromkeys(brands_to_process))
     if args.facing:
-        # Brand-facing reports
-        from app.reports.brand_facing import generate_json, generate_excel
         print(f"\nGenerating {len(brands_to_process)} brand-facing report(s)...\n")
-        for brand_name in brands_to_process:
-            match = next((b for b in brands if b.upper() == brand_name.upper()), None)
-            if not match:
-                print(f"  Brand not found: '{brand_name}'")
-                continue
-            safe = match.replace("/", "-").replace("\\", "-")[:40]
-            out = BRAND_REPORTS_FOLDER / f"Brand_Facing_{safe}.xlsx"
-            generate_excel(store, match, out, period)
-            data = generate_json(store, match, period)
-            s = data["summary"]
-            print(f"   {match}")
-            print(f"      ${s['total_revenue']:,.0f}  |  Coverage: {s['store_coverage']}  |  Velocity: #{s['velocity_rank']}")
     else:
-        # Dispensary-side brand reports
-        from app.reports.brand_dispensary import generate_json, generate_excel
-        comparison = period.previous() if period else None
         print(f"\nGenerating {len(brands_to_process)} brand report(s)...\n")
-        for brand_name in brands_to_process:
-            match = next((b for b in brands if b.upper() == brand_name.upper()), None)
-            if not match:
-                print(f"  Brand not found: '{brand_name}'")
-                continue
-            brand_df = store.get_brand(match, period)
-            if len(brand_df) < 5:
-                continue
-            safe = match.replace("/", "-").replace("\\", "-")[:40]
-            out = BRAND_REPORTS_FOLDER / f"Brand_Report_{safe}.xlsx"
-            generate_excel(store, match, out, period, comparison)
-            data = generate_json(store, match, period, comparison)
-            s = data["summary"]
-            icon = "+" if s["margin_vs_category"] >= 0 else "-"
-            rank_str = f"#{s['category_rank']}/{s['category_total']}" if s["category_rank"] > 0 else ""
-            print(f"   [{icon}] {match}")
-            print(f"      ${s['total_revenue']:,.0f}  |  {s['overall_margin']:.1f}%  |  {s['primary_category']} {rank_str}")
+    comparison = period.previous() if period and not args.facing else None
+    entries = [(match, bool(args.facing), BRAND_REPORTS_FOLDER, period, comparison) for match in brands_to_process]
+    pool = _store_pool(store, len(entries))
+    if pool is None:
+        _init_store_worker(store)
+        for entry in entries:
+            lines = _brand_report_task(entry)
+            if lines:
+                print(lines)
+    else:
+        # map() yields in submission order, so output matches a serial run
+        with pool:
+            for lines in pool.map(_brand_report_task, entries):
+                if lines:
+                    print(lines)
 
     print(f"\nReports saved to: {BRAND_REPORTS_FOLDER}\n")
 
 
+# --- Worker pools ---
+# Report generation is independent pandas work against a read-only DataStore.
+# Where forking is safe (see loader._fork_context) workers inherit the parent's
+# store for free; elsewhere they start fresh under spawn and each loads its
+# own copy once, in the initializer (from the snapshot cache when warm).
+
+_WORKER_STORE = None
+
+
+def _init_store_worker(store=None):
+    global _WORKER_STORE
+    if store is None:
+        import contextlib
+        import io
+        from app.data.store import DataStore
+        with contextlib.redirect_stdout(io.StringIO()):
+            store = DataStore().load()
+    _WORKER_STORE = store
+
+
+def _store_pool(store, max_tasks: int | None = None):
+    """Process pool whose workers share `store`, or None when only one CPU is available."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from app.data.loader import _fork_context
+
+    workers = os.cpu_count() or 1
+    if max_tasks is not None:
+        workers = min(workers, max_tasks)
+    if workers < 2:
+        return None
+    ctx = _fork_context()
+    if ctx is None:
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_store_worker,
+        )
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx,
+        initializer=_init_store_worker, initargs=(store,),
+    )
+
+
+# (output file, report module, message when it raises ValueError or None to propagate)
+_MASTER_SUITE = [
+    ("Margin_Report.xlsx", "app.reports.margin_report", None),
+    ("Deal_Performance_Report.xlsx", "app.reports.deal_report", None),
+    ("Budtender_Performance_Report.xlsx", "app.reports.budtender_report", "Skipped Budtender report — no BT data"),
+    ("Customer_Insights_Report.xlsx", "app.reports.customer_report", None),
+    ("Rewards_Markout_Report.xlsx", "app.reports.rewards_report", None),
+]
+
+# Master dashboard tab -> report module (static export)
+_MASTER_TABS = {
+    "margin": "app.reports.margin_report",
+    "deals": "app.reports.deal_report",
+    "budtenders": "app.reports.budtender_report",
+    "customers": "app.reports.customer_report",
+    "rewards": "app.reports.rewards_report",
+    "retention": "app.reports.retention_report",
+    "forecast": "app.reports.forecast_report",
+    "products": "app.reports.product_intel_report",
+    "waterfall": "app.reports.waterfall_report",
+    "basket": "app.reports.basket_report",
+    "heatmap": "app.reports.heatmap_report",
+}
+_MASTER_GENERATORS: dict = {}
+
+
+def _load_master(tab: str):
+    """generate_json for a master tab, importing its module on first use."""
+    gen = _MASTER_GENERATORS.get(tab)
+    if gen is None:
+        gen = _MASTER_GENERATORS[tab] = importlib.import_module(_MASTER_TABS[tab]).generate_json
+    return gen
+
+
+def _master_report_task(entry) -> str:
+    """Build one master-suite workbook; returns the status line to print."""
+    filename, mod_path, skip_note, output_folder, period = entry
+    generate_excel = importlib.import_module(mod_path).generate_excel
+    try:
+        generate_excel(_WORKER_STORE, output_folder / filename, period)
+    except ValueError:
+        if skip_note is None:
+            raise
+        return f"({skip_note})"
+    return filename
+
+
+def _brand_report_task(entry) -> str | None:
+    """Build one brand workbook; returns the lines to print, or None when skipped."""
+    match, facing, folder, period, comparison = entry
+    store = _WORKER_STORE
+    safe = match.replace("/", "-").replace("\\", "-")[:40]
+    brand_df = store.get_brand(match, period)
+    if facing:
+        # Brand-facing reports
+        from app.reports.brand_facing import generate_json, generate_excel
+        generate_excel(store, match, folder / f"Brand_Facing_{safe}.xlsx", period, brand_df=brand_df)
+        s = generate_json(store, match, period, brand_df=brand_df)["summary"]
+        return (
+            f"   {match}\n"
+            f"      ${s['total_revenue']:,.0f}  |  Coverage: {s['store_coverage']}  |  Velocity: #{s['velocity_rank']}"
+        )
+
+    # Dispensary-side brand reports
+    from app.reports.brand_dispensary import generate_json, generate_excel
+    if len(brand_df) < 5:
+        return None
+    generate_excel(store, match, folder / f"Brand_Report_{safe}.xlsx", period, comparison, brand_df=brand_df)
+    s = generate_json(store, match, period, comparison, brand_df=brand_df)["summary"]
+    icon = "+" if s["margin_vs_category"] >= 0 else "-"
+    rank_str = f"#{s['category_rank']}/{s['category_total']}" if s["category_rank"] > 0 else ""
+    return (
+        f"   [{icon}] {match}\n"
+        f"      ${s['total_revenue']:,.0f}  |  {s['overall_margin']:.1f}%  |  {s['primary_category']} {rank_str}"
+    )
+
+
 def cmd_master(args):
     """Generate all 5 master suite reports."""
-    print("\n" + "=" * 70)
-    print("  THRIVE ANALYTICS — MASTER SUITE")
-    print("=" * 70)
-    print(f"  Started: {datetime.now():%Y-%m-%d %H:%M:%S}")
+    from app.config import REPORTS_FOLDER
+    from app.data.store import DataStore
+
+    # One clock read names the output folder and stamps the banner
+    started = datetime.now()
+    # Status goes out in one write per phase rather than a print per line
+    print("\n".join([
+        "\n" + "=" * 70,
+        "  THRIVE ANALYTICS — MASTER SUITE",
+        "=" * 70,
+        f"  Started: {started:%Y-%m-%d %H:%M:%S}",
+    ]))
 
-    store = DataStore().load()
     period = _build_period(args)
+    store = DataStore().load()
     date_range = store.date_range(period)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_folder = REPORTS_FOLDER / timestamp
+    output_folder = REPORTS_FOLDER / f"{started:%Y%m%d_%H%M%S}"
     output_folder.mkdir(parents=True, exist_ok=True)
 
-    print(f"\n  Period: {date_range}")
-    print(f"  Generating reports...\n")
+    print(f"\n  Period: {date_range}\n  Generating reports...\n")
 
-    from app.reports.margin_report import generate_excel as margin_excel
-    margin_excel(store, output_folder / "Margin_Report.xlsx", period)
-    print("   Margin_Report.xlsx")
-
-    from app.reports.deal_report import generate_excel as deal_excel
-    deal_excel(store, output_folder / "Deal_Performance_Report.xlsx", period)
-    print("   Deal_Performance_Report.xlsx")
-
-    from app.reports.budtender_report import generate_excel as bt_excel
-    try:
-        bt_excel(store, output_folder / "Budtender_Performance_Report.xlsx", period)
-        print("   Budtender_Performance_Report.xlsx")
-    except ValueError:
-        print("   (Skipped Budtender report — no BT data)")
+    # The five workbooks are independent — build them concurrently and
+    # report each as it finishes
+    entries = [(*suite, output_folder, period) for suite in _MASTER_SUITE]
+    pool = _store_pool(store, len(entries))
+    if pool is None:
+        _init_store_worker(store)
+        for entry in entries:
+            print(f"   {_master_report_task(entry)}")
+    else:
+        from concurrent.futures import as_completed
+        with pool:
+            for fut in as_completed([pool.submit(_master_report_task, e) for e in entries]):
+                print(f"   {fut.result()}")
 
-    from app.reports.customer_report import generate_excel as cust_excel
-    cust_excel(store, output_folder / "Customer_Insights_Report.xlsx", period)
-    print("   Customer_Insights_Report.xlsx")
+    print(f"\n  Reports saved to: {output_folder}\n" + "=" * 70 + "\n")
 
-    from app.reports.rewards_report import generate_excel as rew_excel
-    rew_excel(store, output_folder / "Rewards_Markout_Report.xlsx", period)
-    print("   Rewards_Markout_Report.xlsx")
 
-    print(f"\n  Reports saved to: {output_folder}")
-    print("=" * 70 + "\n")
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_SEP = re.compile(r"[\s_]+")
 
 
 def _brand_slug(name: str) -> str:
     """Convert brand name to a filesystem-safe slug."""
     s = name.lower().strip()
     s = unicodedata.normalize("NFKD", s)
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s_]+", "-", s).strip("-")
+    s = _SLUG_STRIP.sub("", s)
+    s = _SLUG_SEP.sub("-", s).strip("-")
     return s or "unknown"
 
 
-def _write_json(path: Path, data):
-    """Write sanitised JSON to path, creating parent dirs."""
+def _brand_slugs_bulk(names: list[str]) -> dict[str, str]:
+    """Unique slug per name; collisions get -2, -3, ... in order of appearance."""
+    slugs = {}
+    used = set()
+    next_suffix = Counter()
+    for name in names:
+        base = s = _brand_slug(name)
+        if s in used:
+            # Suffixes below next_suffix[base] are all taken — resume from there
+            i = next_suffix[base] or 2
+            while f"{base}-{i}" in used:
+                i += 1
+            next_suffix[base] = i + 1
+            s = f"{base}-{i}"
+        used.add(s)
+        slugs[name] = s
+    return slugs
+
+
+def _json_bytes(data) -> bytes:
+    """Sanitised, compact JSON encoding used for every exported file."""
     from app.analytics.common import sanitize_for_json
-    path.parent.mkdir(parents=True, exist_ok=True)
     clean = sanitize_for_json(data)
-    with open(path, "w") as f:
-        json.dump(clean, f, separators=(",", ":"), default=str)
+    if orjson is not None:
+        # Datetimes go through default=str like the stdlib path ("YYYY-MM-DD HH:MM:SS")
+        return orjson.dumps(
+            clean, default=str,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(clean, separators=(",", ":"), default=str).encode()
+
+
+def _write_bytes(path: Path, payload: bytes):
+    """Write payload to path with one open/write/close and no fsync (exports are regenerable)."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        # First file in its folder: create the folder only when it's missing
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _fast_copy(src: Path, dst: Path):
+    """Copy a static asset as cheaply as the filesystem allows.
+
+    An in-kernel copy_file_range (reflink-aware on btrfs/xfs), then a plain
+    copy. Never a hardlink: an edit to the exported copy would change the
+    source in app/static. An up-to-date dst is left alone.
+    """
+    st = src.stat()
+    try:
+        dst_st = dst.stat()
+        # A dst sharing src's inode (a hardlink from an older export) is replaced
+        same_inode = (dst_st.st_dev, dst_st.st_ino) == (st.st_dev, st.st_ino)
+        if not same_inode and (dst_st.st_size, dst_st.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return
+        dst.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = st.st_size
+            while remaining > 0:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        if remaining == 0:
+            shutil.copystat(src, dst)
+            return
+    except (AttributeError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+class _JsonWriteQueue:
+    """Hands export files to a background writer thread so report generation
+    never waits on the filesystem. Writes happen in submission order."""
+
+    def __init__(self, maxsize: int = 64):
+        self._queue = queue.Queue(maxsize)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="export-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, path: Path, payload: bytes):
+        # Fail fast rather than queue behind a writer that already gave up
+        if self._error is not None:
+            raise self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("export writer thread is not running")
+        self._queue.put((path, payload))
+
+    def put_json(self, path: Path, data):
+        """Encode data (sanitised) on the calling thread and queue the write."""
+        self.put(path, _json_bytes(data))
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue  # keep consuming so put() never blocks on a full queue
+            try:
+                _write_bytes(*item)
+            except BaseException as e:
+                self._error = e
+
+    def join(self):
+        """Wait until every queued write has been issued, then stop the thread.
+
+        Writes are not fsynced (see _write_bytes). Re-raises the first write
+        error, if any. Safe to call more than once.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
 
 
 def _period_key(pf: PeriodFilter | None) -> str:
@@ -203,18 +465,54 @@ def _period_key(pf: PeriodFilter | None) -> str:
 
 
 def _checked_replace(html: str, old: str, new: str, label: str) -> str:
-    if old not in html:
+    idx = html.find(old)
+    if idx == -1:
         print(f"  WARNING: Could not patch '{label}' — pattern not found")
         return html
-    return html.replace(old, new, 1)
+    return html[:idx] + new + html[idx + len(old):]
 
 
 _EXPORT_VERSION_MARKER = "THRIVE_STATIC_EXPORT_V2"
 
+_DM_NAV_RE = re.compile(
+    r'\s*<!-- Data Manager -->\s*<div class="nav-item".*?</div>\s*</nav>',
+    re.DOTALL,
+)
+_DM_SECTION_RE = re.compile(
+    r'<!-- =+ -->\s*<!-- DATA MANAGER PAGE.*?</section>',
+    re.DOTALL,
+)
+_EXCEL_BTN_RE = re.compile(
+    r'<div class="flex gap-2">\s*<a :href="[^"]*master/\' \+ masterTab \+ \'/excel[^"]*"[^>]*>.*?Download.*?</a>\s*<a :href="[^"]*master/suite/excel[^"]*"[^>]*>.*?Download All.*?</a>\s*</div>',
+    re.DOTALL,
+)
+
+# Unchecked literal patches for steps 15-17 (chart cleanup, MoM), applied
+# together in one scan at step 15 — none of them overlap or feed each other
+_SIMPLE_PATCHES = {
+    # 15. Fix _c() chart function: use Chart.getChart for proper cleanup
+    "if (this._charts[id]) { this._charts[id].destroy(); delete this._charts[id]; }":
+        "if (this._charts[id]) { try { this._charts[id].destroy(); } catch(e){} delete this._charts[id]; }",
+    "self._charts[id] = new Chart(el, config);":
+        "const existing = Chart.getChart(el); if (existing) existing.destroy();\n          self._charts[id] = new Chart(el, config);",
+    # Use setTimeout instead of requestAnimationFrame for chart rendering
+    "requestAnimationFrame(tryRender);": "setTimeout(tryRender, 300);",
+    # 17. MoM always loads all-time data (comparing single months is pointless)
+    "this.momData = await this.api('/api/month-over-month', this.periodParams())":
+        "this.momData = await this.api('/api/month-over-month', {period_type: 'all'})",
+}
+_SIMPLE_PATCH_RE = re.compile("|".join(map(re.escape, _SIMPLE_PATCHES)))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_index_template() -> str:
+    """Source index.html, read once per process."""
+    return (Path(__file__).parent / "static" / "index.html").read_text()
+
+
 def _generate_static_index(out: Path):
     """Read app/static/index.html and patch it for static-file mode."""
-    src = Path(__file__).parent / "static" / "index.html"
-    html = src.read_text()
+    html = _load_index_template()
 
     if _EXPORT_VERSION_MARKER not in html:
         raise RuntimeError(
@@ -323,18 +621,10 @@ def _generate_static_index(out: Path):
         "datamanager in loadCurrentView")
 
     # --- 6. Remove Data Manager nav item ---
-    dm_nav_pattern = re.compile(
-        r'\s*<!-- Data Manager -->\s*<div class="nav-item".*?</div>\s*</nav>',
-        re.DOTALL,
-    )
-    html = dm_nav_pattern.sub("\n    </nav>", html, count=1)
+    html = _DM_NAV_RE.sub("\n    </nav>", html, count=1)
 
     # --- 7. Remove the Data Manager section ---
-    dm_section_pattern = re.compile(
-        r'<!-- =+ -->\s*<!-- DATA MANAGER PAGE.*?</section>',
-        re.DOTALL,
-    )
-    html = dm_section_pattern.sub("", html, count=1)
+    html = _DM_SECTION_RE.sub("", html, count=1)
 
     # --- 8. Remove datamanager from pageTitle ---
     html = html.replace(", datamanager:'Data Manager'", "")
@@ -383,12 +673,7 @@ def _generate_static_index(out: Path):
 
     # --- 12. Remove Excel download links in master reports ---
     # Replace the download buttons container with empty div
-    html = re.sub(
-        r'<div class="flex gap-2">\s*<a :href="[^"]*master/\' \+ masterTab \+ \'/excel[^"]*"[^>]*>.*?Download.*?</a>\s*<a :href="[^"]*master/suite/excel[^"]*"[^>]*>.*?Download All.*?</a>\s*</div>',
-        '<!-- Excel downloads removed in static mode -->',
-        html,
-        flags=re.DOTALL,
-    )
+    html = _EXCEL_BTN_RE.sub('<!-- Excel downloads removed in static mode -->', html)
 
     # --- 13. (removed — ranges now supported in static mode) ---
 
@@ -398,30 +683,11 @@ def _generate_static_index(out: Path):
         "async init() {\n      if (this._initialized) return;\n      this._initialized = true;\n      // Each call catches independently",
         "init guard")
 
-    # --- 15. Fix _c() chart function: use Chart.getChart for proper cleanup ---
-    html = html.replace(
-        "if (this._charts[id]) { this._charts[id].destroy(); delete this._charts[id]; }",
-        "if (this._charts[id]) { try { this._charts[id].destroy(); } catch(e){} delete this._charts[id]; }",
-    )
-    # Add Chart.getChart cleanup before creating new chart
-    html = html.replace(
-        "self._charts[id] = new Chart(el, config);",
-        "const existing = Chart.getChart(el); if (existing) existing.destroy();\n          self._charts[id] = new Chart(el, config);",
-    )
-    # Use setTimeout instead of requestAnimationFrame for chart rendering
-    html = html.replace(
-        "requestAnimationFrame(tryRender);",
-        "setTimeout(tryRender, 300);",
-    )
+    # --- 15. Chart cleanup / 17. all-time MoM ---
+    html = _SIMPLE_PATCH_RE.sub(lambda m: _SIMPLE_PATCHES[m.group(0)], html)
 
     # --- 16. (Removed — MoM now uses x-show in source) ---
 
-    # --- 17. MoM always loads all-time data (comparing single months is pointless) ---
-    html = html.replace(
-        "this.momData = await this.api('/api/month-over-month', this.periodParams())",
-        "this.momData = await this.api('/api/month-over-month', {period_type: 'all'})",
-    )
-
     # --- 18. Range-aware loadExecSummary ---
     html = html.replace(
         """    async loadExecSummary() {
@@ -635,12 +901,52 @@ def _generate_static_index(out: Path):
     print(f"  Generated {out}")
 
 
+# --- Brand export workers ---
+# Each (brand, year) report is independent pandas work against the read-only
+# DataStore, so the brand phase fans out over a _store_pool.
+
+
+def _brand_export_task(task):
+    """Build one brand's dispensary + facing JSON for all-time (year None) or a single year.
+
+    Returns (skipped, files, failures) where files is a list of (relative path, JSON bytes).
+    """
+    from app.data.schemas import PeriodFilter, PeriodType
+    from app.reports.brand_dispensary import generate_json as brand_disp_json
+    from app.reports.brand_facing import generate_json as brand_face_json
+
+    brand, slug, year = task
+    store = _WORKER_STORE
+    pf = None if year is None else PeriodFilter(period_type=PeriodType.YEAR, year=year)
+    suffix = "" if year is None else f"-{year}"
+    label = "" if year is None else f" {year}"
+    files, failures = [], []
+    brand_df = None
+    try:
+        # Filtered once; both reports reuse it
+        brand_df = store.get_brand(brand, pf)
+        if len(brand_df) < 5:
+            return True, files, failures
+        report = brand_disp_json(store, brand, pf, None, brand_df=brand_df)
+        files.append((f"data/brands/{slug}/report{suffix}.json", _json_bytes(report)))
+    except Exception as e:
+        failures.append(f"{brand} dispensary{label}: {e}")
+    try:
+        facing = brand_face_json(store, brand, pf, brand_df=brand_df)
+        files.append((f"data/brands/{slug}/facing{suffix}.json", _json_bytes(facing)))
+    except Exception as e:
+        failures.append(f"{brand} facing{label}: {e}")
+    return False, files, failures
+
+
 def cmd_export(args):
     """Export pre-computed static site to output directory."""
     from app.analytics.dashboard import (
         executive_summary, month_over_month, store_performance, year_end_summary,
     )
     from app.config import INTERNAL_BRANDS
+    from app.data.store import DataStore
+    from app.data.schemas import PeriodFilter, PeriodType
 
     print("\n" + "=" * 70)
     print("  THRIVE ANALYTICS — STATIC SITE EXPORT")
@@ -651,205 +957,176 @@ def cmd_export(args):
     out.mkdir(parents=True, exist_ok=True)
     export_failures = []
 
-    # Load data
+    # Load data — before the writer thread starts, since the loader may fork
     store = DataStore().load()
     brands = store.brands()
+    store_names = store.stores()
     periods = store.periods_available()
     years = sorted(set(p["year"] for p in periods))
     year_months = sorted(set((p["year"], p["month"]) for p in periods))
 
-    print(f"  {store.row_count():,} rows, {len(store.stores())} stores, {len(brands)} brands, {len(periods)} periods")
-    print(f"  Output: {out.resolve()}\n")
-
-    # Build brand slug mapping
-    slugs = {}
-    used_slugs = {}
-    for b in brands:
-        s = _brand_slug(b)
-        if s in used_slugs:
-            i = 2
-            while f"{s}-{i}" in used_slugs:
-                i += 1
-            s = f"{s}-{i}"
-        used_slugs[s] = b
-        slugs[b] = s
-
-    # --- Meta files ---
-    print("  [1/6] Meta files...")
-    _write_json(out / "data/health.json", {
-        "status": "ok",
-        "rows": store.row_count(),
-        "regular_rows": store.regular_count(),
-        "stores": len(store.stores()),
-        "brands": len(brands),
-        "periods": len(periods),
-    })
-    _write_json(out / "data/brands.json", {
-        "brands": brands,
-        "count": len(brands),
-        "internal_brands": [b for b in brands if b.upper() in INTERNAL_BRANDS],
-        "brand_slugs": slugs,
-    })
-    _write_json(out / "data/stores.json", {"stores": store.stores()})
-    _write_json(out / "data/periods.json", {"periods": periods})
-
-    # --- Dashboard views for each period ---
-    print("  [2/6] Dashboard views (exec, mom, store-perf)...")
-    period_filters = [None]  # None = all-time
-    for p in periods:
-        period_filters.append(PeriodFilter(
-            period_type=PeriodType.MONTH, year=p["year"], month=p["month"],
-        ))
-
-    for i, pf in enumerate(period_filters):
-        key = _period_key(pf)
-        label = f"all-time" if pf is None else key
-        print(f"    [{i+1}/{len(period_filters)}] {label}")
-        _write_json(out / f"data/exec/{key}.json", executive_summary(store, pf))
-        _write_json(out / f"data/mom/{key}.json", month_over_month(store, pf))
-        _write_json(out / f"data/stores-perf/{key}.json", store_performance(store, pf))
-
-    # --- Year-end summaries ---
-    print("  [3/6] Year-end summaries...")
-    for y in years:
-        print(f"    {y}")
-        _write_json(out / f"data/yearend/{y}.json", year_end_summary(store, y))
-
-    # --- Brand reports (all-time) ---
-    print(f"  [4/6] Brand reports ({len(brands)} brands)...")
-    from app.reports.brand_dispensary import generate_json as brand_disp_json
-    from app.reports.brand_facing import generate_json as brand_face_json
-
-    skipped = 0
-    for i, brand in enumerate(brands, 1):
-        if i % 25 == 0 or i == len(brands):
-            print(f"    [{i}/{len(brands)}]")
-        slug = slugs[brand]
-        try:
-            brand_df = store.get_brand(brand, None)
-            if len(brand_df) < 5:
-                skipped += 1
-                continue
-            report = brand_disp_json(store, brand, None, None)
-            _write_json(out / f"data/brands/{slug}/report.json", report)
-        except Exception as e:
-            export_failures.append(f"{brand} dispensary: {e}")
-        try:
-            facing = brand_face_json(store, brand, None)
-            _write_json(out / f"data/brands/{slug}/facing.json", facing)
-        except Exception as e:
-            export_failures.append(f"{brand} facing: {e}")
-    if skipped:
-        print(f"    ({skipped} brands skipped — fewer than 5 transactions)")
-
-    # --- Per-year brand reports ---
-    print(f"  [4b/6] Per-year brand reports ({len(brands)} brands × {len(years)} years)...")
-    year_skipped = 0
-    year_written = 0
-    for y in years:
-        year_pf = PeriodFilter(period_type=PeriodType.YEAR, year=y)
-        for brand in brands:
-            slug = slugs[brand]
-            try:
-                brand_df = store.get_brand(brand, year_pf)
-                if len(brand_df) < 5:
-                    year_skipped += 1
-                    continue
-                report = brand_disp_json(store, brand, year_pf, None)
-                _write_json(out / f"data/brands/{slug}/report-{y}.json", report)
-                year_written += 1
-            except Exception as e:
-                export_failures.append(f"{brand} dispensary {y}: {e}")
-            try:
-                facing = brand_face_json(store, brand, year_pf)
-                _write_json(out / f"data/brands/{slug}/facing-{y}.json", facing)
-            except Exception as e:
-                export_failures.append(f"{brand} facing {y}: {e}")
-        print(f"    {y}: done")
-    print(f"    {year_written} year-files written, {year_skipped} skipped")
-
-    # --- Per-month master reports ---
-    print("  [5a/6] Per-month master reports...")
-    import importlib
-    master_modules = {
-        "margin": "app.reports.margin_report",
-        "deals": "app.reports.deal_report",
-        "budtenders": "app.reports.budtender_report",
-        "customers": "app.reports.customer_report",
-        "rewards": "app.reports.rewards_report",
-        "retention": "app.reports.retention_report",
-        "forecast": "app.reports.forecast_report",
-        "products": "app.reports.product_intel_report",
-        "waterfall": "app.reports.waterfall_report",
-        "basket": "app.reports.basket_report",
-        "heatmap": "app.reports.heatmap_report",
-    }
-    for tab, mod_path in master_modules.items():
-        mod = importlib.import_module(mod_path)
-        (out / f"data/master/{tab}").mkdir(parents=True, exist_ok=True)
-        for y, m in year_months:
-            pk = f"{y}-{str(m).zfill(2)}"
-            pf = PeriodFilter(period_type=PeriodType.MONTH, year=y, month=m)
-            try:
-                data = mod.generate_json(store, pf)
-                _write_json(out / f"data/master/{tab}/{pk}.json", data)
-            except Exception as e:
-                export_failures.append(f"master/{tab}/{pk}: {e}")
-        print(f"    {tab}: {len(year_months)} month files")
-
-    # --- Master reports (all-time + per-store) ---
-    print("  [5b/6] Master reports...")
-    master_modules = {
-        "margin": "app.reports.margin_report",
-        "deals": "app.reports.deal_report",
-        "budtenders": "app.reports.budtender_report",
-        "customers": "app.reports.customer_report",
-        "rewards": "app.reports.rewards_report",
-        "retention": "app.reports.retention_report",
-        "forecast": "app.reports.forecast_report",
-        "products": "app.reports.product_intel_report",
-        "waterfall": "app.reports.waterfall_report",
-        "basket": "app.reports.basket_report",
-        "heatmap": "app.reports.heatmap_report",
-    }
-    store_names = store.stores()
-    store_slugs = {s: _brand_slug(s) for s in store_names}
-    # Write store slug mapping into stores.json for frontend lookup
-    _write_json(out / "data/stores.json", {
-        "stores": store_names,
-        "store_slugs": store_slugs,
-    })
-    for tab, mod_path in master_modules.items():
-        mod = importlib.import_module(mod_path)
-        # All-stores version
-        try:
-            data = mod.generate_json(store, None)
-            _write_json(out / f"data/master/{tab}.json", data)
-            print(f"    {tab}.json")
-        except Exception as e:
-            print(f"    WARNING: {tab} failed: {e}")
-            _write_json(out / f"data/master/{tab}.json", {"error": str(e)})
-        # Per-store versions
-        for sname in store_names:
-            slug = store_slugs[sname]
+    writer = _JsonWriteQueue()
+    try:
+        print(f"  {store.row_count():,} rows, {len(store_names)} stores, {len(brands)} brands, {len(periods)} periods")
+        print(f"  Output: {out.resolve()}\n")
+
+        # Build brand + store slug mappings up front so each meta file is written once
+        slugs = _brand_slugs_bulk(brands)
+        store_slugs = {s: _brand_slug(s) for s in store_names}
+
+        # --- Meta files ---
+        print("  [1/6] Meta files...")
+        writer.put_json(out / "data/health.json", {
+            "status": "ok",
+            "rows": store.row_count(),
+            "regular_rows": store.regular_count(),
+            "stores": len(store_names),
+            "brands": len(brands),
+            "periods": len(periods),
+        })
+        writer.put_json(out / "data/brands.json", {
+            "brands": brands,
+            "count": len(brands),
+            "internal_brands": [b for b in brands if b.upper() in INTERNAL_BRANDS],
+            "brand_slugs": slugs,
+        })
+        # Store slug mapping is used by the frontend for per-store master files
+        writer.put_json(out / "data/stores.json", {
+            "stores": store_names,
+            "store_slugs": store_slugs,
+        })
+        writer.put_json(out / "data/periods.json", {"periods": periods})
+
+        # --- Dashboard views for each period ---
+        print("  [2/6] Dashboard views (exec, mom, store-perf)...")
+        period_filters = [None]  # None = all-time
+        for p in periods:
+            period_filters.append(PeriodFilter(
+                period_type=PeriodType.MONTH, year=p["year"], month=p["month"],
+            ))
+
+        period_keys = [_period_key(pf) for pf in period_filters]
+        exec_dir, mom_dir, perf_dir = out / "data/exec", out / "data/mom", out / "data/stores-perf"
+
+        for i, (pf, key) in enumerate(zip(period_filters, period_keys)):
+            label = f"all-time" if pf is None else key
+            print(f"    [{i+1}/{len(period_filters)}] {label}")
+            writer.put_json(exec_dir / f"{key}.json", executive_summary(store, pf))
+            writer.put_json(mom_dir / f"{key}.json", month_over_month(store, pf))
+            writer.put_json(perf_dir / f"{key}.json", store_performance(store, pf))
+
+        # --- Year-end summaries ---
+        print("  [3/6] Year-end summaries...")
+        yearend_dir = out / "data/yearend"
+        for y in years:
+            print(f"    {y}")
+            writer.put_json(yearend_dir / f"{y}.json", year_end_summary(store, y))
+
+        # --- Brand reports (all-time + per-year) ---
+        brand_tasks = [(b, slugs[b], None) for b in brands]
+        brand_tasks += [(b, slugs[b], y) for y in years for b in brands]
+        # The pool only forks from a single-threaded process, and a
+        # fork-context pool forks every worker on its first submit: drain and
+        # stop the writer until pool.map has run, then start a fresh one
+        writer.join()
+        pool = _store_pool(store)
+        if pool is None:
+            _init_store_worker(store)
+            results = map(_brand_export_task, brand_tasks)
+        else:
+            results = pool.map(_brand_export_task, brand_tasks, chunksize=8)
+        writer = _JsonWriteQueue()
+
+        def write_brand_result(result):
+            skipped, files, failures = result
+            for rel, payload in files:
+                writer.put(out / rel, payload)
+            export_failures.extend(failures)
+            return skipped, files
+
+        print(f"  [4/6] Brand reports ({len(brands)} brands)...")
+        skipped = 0
+        for i, brand in enumerate(brands, 1):
+            if i % 25 == 0 or i == len(brands):
+                print(f"    [{i}/{len(brands)}]")
+            was_skipped, _ = write_brand_result(next(results))
+            skipped += was_skipped
+        if skipped:
+            print(f"    ({skipped} brands skipped — fewer than 5 transactions)")
+
+        print(f"  [4b/6] Per-year brand reports ({len(brands)} brands × {len(years)} years)...")
+        year_skipped = 0
+        year_written = 0
+        for y in years:
+            for brand in brands:
+                was_skipped, files = write_brand_result(next(results))
+                year_skipped += was_skipped
+                year_written += any(rel.endswith(f"report-{y}.json") for rel, _ in files)
+            print(f"    {y}: done")
+        print(f"    {year_written} year-files written, {year_skipped} skipped")
+        if pool is not None:
+            pool.shutdown()
+
+        # --- Per-month master reports ---
+        print("  [5a/6] Per-month master reports...")
+        # Same month filters for every tab — build them (and their keys) once
+        month_filters = [
+            (f"{y}-{m:02d}", PeriodFilter(period_type=PeriodType.MONTH, year=y, month=m))
+            for y, m in year_months
+        ]
+        master_dir = out / "data/master"
+        for tab in _MASTER_TABS:
+            generate_json = _load_master(tab)
+            tab_dir = master_dir / tab
+            tab_dir.mkdir(parents=True, exist_ok=True)
+            for pk, pf in month_filters:
+                try:
+                    data = generate_json(store, pf)
+                    writer.put_json(tab_dir / f"{pk}.json", data)
+                except Exception as e:
+                    export_failures.append(f"master/{tab}/{pk}: {e}")
+            print(f"    {tab}: {len(year_months)} month files")
+
+        # --- Master reports (all-time + per-store) ---
+        print("  [5b/6] Master reports...")
+        store_filters = [
+            (store_slugs[sname], PeriodFilter(period_type=PeriodType.ALL, store=sname))
+            for sname in store_names
+        ]
+        for tab in _MASTER_TABS:
+            generate_json = _load_master(tab)
+            tab_dir = master_dir / tab
+            # All-stores version
+            all_path = master_dir / f"{tab}.json"
             try:
-                pf = PeriodFilter(period_type=PeriodType.ALL, store=sname)
-                data = mod.generate_json(store, pf)
-                _write_json(out / f"data/master/{tab}/{slug}.json", data)
+                data = generate_json(store, None)
+                writer.put_json(all_path, data)
+                print(f"    {tab}.json")
             except Exception as e:
-                print(f"    WARNING: {tab}/{slug} failed: {e}")
-                _write_json(out / f"data/master/{tab}/{slug}.json", {"error": str(e)})
-        print(f"      + {len(store_names)} store files")
-
-    # --- Copy static assets + generate patched index.html ---
-    print("  [6/6] Static assets + index.html...")
-    static_dir = Path(__file__).parent / "static"
-    for asset in ["chart.min.js", "logo.png"]:
-        src = static_dir / asset
-        if src.exists():
-            shutil.copy2(src, out / asset)
-
-    _generate_static_index(out / "index.html")
+                print(f"    WARNING: {tab} failed: {e}")
+                writer.put_json(all_path, {"error": str(e)})
+            # Per-store versions
+            for slug, pf in store_filters:
+                try:
+                    data = generate_json(store, pf)
+                    writer.put_json(tab_dir / f"{slug}.json", data)
+                except Exception as e:
+                    print(f"    WARNING: {tab}/{slug} failed: {e}")
+                    writer.put_json(tab_dir / f"{slug}.json", {"error": str(e)})
+            print(f"      + {len(store_names)} store files")
+
+        # --- Copy static assets + generate patched index.html ---
+        print("  [6/6] Static assets + index.html...")
+        static_dir = Path(__file__).parent / "static"
+        for asset in ["chart.min.js", "logo.png"]:
+            src = static_dir / asset
+            if src.exists():
+                _fast_copy(src, out / asset)
+
+        _generate_static_index(out / "index.html")
+    finally:
+        # Flush whatever was queued even when a report raised
+        writer.join()
 
     # Summary
     if export_failures:
@@ -876,6 +1153,35 @@ def cmd_serve(args):
                 timeout_keep_alive=65)
 
 
+_SUBCOMMANDS = {
+    "brand": "Generate brand reports",
+    "master": "Generate master suite",
+    "serve": "Start API server",
+    "export": "Export static site (for Vercel)",
+}
+
+
+def _sniff_subcommand(argv):
+    """Return the subcommand being run, or None (help / missing / bad command).
+
+    The top-level parser takes no options besides -h, so a runnable command
+    line always has its subcommand first; anything else is left to argparse.
+    """
+    if len(argv) > 1 and argv[1] in _SUBCOMMANDS:
+        return argv[1]
+    return None
+
+
+def _period_parent() -> argparse.ArgumentParser:
+    """Shared --period/--year/--month/--quarter options (read by _build_period)."""
+    parent = argparse.ArgumentParser(add_help=False)
+    parent.add_argument("--period", choices=["month", "quarter", "year"], help="Period type")
+    parent.add_argument("--year", type=_YEAR, help="Year")
+    parent.add_argument("--month", type=_MONTH, help="Month (1-12)")
+    parent.add_argument("--quarter", type=_QUARTER, help="Quarter (1-4)")
+    return parent
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Thrive Analytics — Cannabis retail analytics engine",
@@ -883,36 +1189,39 @@ def main():
     )
     subparsers = parser.add_subparsers(dest="command", help="Command")
 
-    # brand subcommand
-    brand_parser = subparsers.add_parser("brand", help="Generate brand reports")
-    brand_parser.add_argument("brands", nargs="*", help="Brand name(s)")
-    brand_parser.add_argument("--list", action="store_true", help="List brands")
-    brand_parser.add_argument("--top", type=int, help="Top N brands by revenue")
-    brand_parser.add_argument("--facing", nargs="*", help="Generate brand-facing report(s)")
-    brand_parser.add_argument("--period", choices=["month", "quarter", "year"], help="Period type")
-    brand_parser.add_argument("--year", type=int, help="Year")
-    brand_parser.add_argument("--month", type=int, help="Month (1-12)")
-    brand_parser.add_argument("--quarter", type=int, help="Quarter (1-4)")
-    brand_parser.set_defaults(func=cmd_brand)
-
-    # master subcommand
-    master_parser = subparsers.add_parser("master", help="Generate master suite")
-    master_parser.add_argument("--period", choices=["month", "quarter", "year"], help="Period type")
-    master_parser.add_argument("--year", type=int, help="Year")
-    master_parser.add_argument("--month", type=int, help="Month (1-12)")
-    master_parser.add_argument("--quarter", type=int, help="Quarter (1-4)")
-    master_parser.set_defaults(func=cmd_master)
-
-    # serve subcommand
-    serve_parser = subparsers.add_parser("serve", help="Start API server")
-    serve_parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")), help="Port (default 8000)")
-    serve_parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
-    serve_parser.set_defaults(func=cmd_serve)
-
-    # export subcommand
-    export_parser = subparsers.add_parser("export", help="Export static site (for Vercel)")
-    export_parser.add_argument("--output", default="public", help="Output directory (default: public)")
-    export_parser.set_defaults(func=cmd_export)
+    # Only the subcommand being run gets its full argument set; the others are
+    # help-only stubs, so --help and "invalid choice" still list them all.
+    sub = _sniff_subcommand(sys.argv)
+    for name, help_text in _SUBCOMMANDS.items():
+        if name != sub:
+            subparsers.add_parser(name, help=help_text)
+
+        # brand subcommand
+        elif name == "brand":
+            brand_parser = subparsers.add_parser("brand", help=help_text, parents=[_period_parent()])
+            brand_parser.add_argument("brands", nargs="*", help="Brand name(s)")
+            brand_parser.add_argument("--list", action="store_true", help="List brands")
+            brand_parser.add_argument("--top", type=int, help="Top N brands by revenue")
+            brand_parser.add_argument("--facing", nargs="*", help="Generate brand-facing report(s)")
+            brand_parser.set_defaults(func=cmd_brand)
+
+        # master subcommand
+        elif name == "master":
+            master_parser = subparsers.add_parser("master", help=help_text, parents=[_period_parent()])
+            master_parser.set_defaults(func=cmd_master)
+
+        # serve subcommand
+        elif name == "serve":
+            serve_parser = subparsers.add_parser("serve", help=help_text)
+            serve_parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")), help="Port (default 8000)")
+            serve_parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+            serve_parser.set_defaults(func=cmd_serve)
+
+        # export subcommand
+        elif name == "export":
+            export_parser = subparsers.add_parser("export", help=help_text)
+            export_parser.add_argument("--output", default="public", help="Output directory (default: public)")
+            export_parser.set_defaults(func=cmd_export)
 
     args = parser.parse_args()
     if not args.command:
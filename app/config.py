@@ -51,6 +51,23 @@ COLUMN_MAP = {
     "Inline/Cart Discounts Used": "inline_discounts",
 }
 
+# Read dtypes for raw columns whose type is known up front: free text and the
+# "$1,234.56" currency strings. Skips pandas' per-column type inference (which
+# always fails on the "$" columns) and keeps an all-empty text column
+# object-typed rather than float NaN. ID columns are left to inference.
+# Declared as object rather than "str": under pandas 3 "str" is the string
+# dtype, while object keeps the raw columns the same on every pandas version.
+_TEXT_COLUMNS = [
+    "Order Type", "Sold By", "Completed At", "Customer Name", "Store", "Product",
+    "Variant Type", "Brand", "Deals Used", "Inline/Cart Discounts Used",
+]
+_CURRENCY_COLUMNS = [
+    "Pre-Discount, Pre-Tax Total", "Discounts", "Taxes", "Post-Discount, Pre-Tax Total",
+    "Total Collected (Post-Discount, Post-Tax, Post-Fees)", "Receipt Total Collected",
+    "Net Profit", "Cost", "Cost Per Item",
+]
+COLUMN_DTYPES = {col: object for col in _TEXT_COLUMNS + _CURRENCY_COLUMNS}
+
 CURRENCY_COLS = [
     "pre_discount_revenue",
     "discounts",
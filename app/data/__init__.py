@@ -1,5 +1,31 @@
 """Data loading, normalization, and in-memory query engine."""
-from .loader import discover_csvs, load_all_csvs
-from .store import DataStore
-from .schemas import PeriodFilter
-from .normalize import normalize_columns, normalize_categories, classify_transaction, classify_deal_type
+from importlib import import_module
+
+# Re-exports resolve on first access (PEP 562), so importing a light
+# submodule such as app.data.schemas doesn't pull in pandas
+_EXPORTS = {
+    "discover_csvs": "loader",
+    "load_all_csvs": "loader",
+    "DataStore": "store",
+    "PeriodFilter": "schemas",
+    "normalize_columns": "normalize",
+    "normalize_categories": "normalize",
+    "classify_transaction": "normalize",
+    "classify_deal_type": "normalize",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
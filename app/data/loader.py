@@ -3,17 +3,26 @@ Multi-month CSV discovery, loading, and deduplication.
 """
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import os
 import re
+import sys
+import time
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from app.config import (
-    INBOX_FOLDER, SALES_KEYWORDS, BT_PERFORMANCE_KEYWORDS, CUSTOMER_KEYWORDS,
+    BASE_FOLDER, INBOX_FOLDER, SALES_KEYWORDS, BT_PERFORMANCE_KEYWORDS, CUSTOMER_KEYWORDS,
     INTERNAL_BRAND_COSTS, COST_CORRECTION_YEARS, PRE_ROLL_CATEGORIES,
     CART_CATEGORIES, DISPOSABLE_CATEGORIES, FLOWER_CATEGORIES, FLOWER_HALF_OZ_KEYWORDS,
 )
-from app.data.normalize import normalize_columns, normalize_categories, classify_transaction, classify_deal_type
+from app.data.normalize import normalize_columns, normalize_categories, parse_number
 
 
 # ---------------------------------------------------------------------------
@@ -33,10 +42,88 @@ def _parse_file_dates(filepath: Path) -> tuple[str | None, str | None]:
     return None, None
 
 
+@lru_cache(maxsize=4096)
+def _end_date_key(filename: str) -> int:
+    """File end-date as YYYYMMDD (0 when the name has no date range).
+
+    Cached: the inbox listing is reused across discoveries (_csv_listing),
+    so the same names come back on every reload.
+    """
+    m = _DATE_RANGE_RE.search(filename)
+    return int(m.group(2).replace("-", "")) if m else 0
+
+
 # ---------------------------------------------------------------------------
 # CSV discovery
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def _keyword_re(keywords: tuple[str, ...]) -> re.Pattern | None:
+    """One alternation over a keyword list, matched against lowered filenames."""
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+def _iter_csv_names(root: str, dirs: dict[str, int] | None = None):
+    """Yield (path, name) for every *.csv file under root.
+
+    Same visiting order as Path.rglob — a directory's entries, then each
+    subdirectory in turn, symlinked directories not followed — but straight
+    off os.scandir, without building a Path per entry. Each directory's
+    mtime_ns, taken before it's listed, is recorded in `dirs` if given.
+    """
+    try:
+        if dirs is not None:
+            dirs[root] = os.stat(root).st_mtime_ns
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif entry.name.endswith(".csv"):
+            yield entry.path, entry.name
+    for sub in subdirs:
+        yield from _iter_csv_names(sub, dirs)
+
+
+# Directories modified more recently than this aren't trusted to validate a
+# cached listing: a coarse-timestamp filesystem could hide a second change
+_LISTING_SETTLE_NS = 2_000_000_000
+_listings: dict[str, tuple[dict[str, int], list[tuple[str, str]]]] = {}
+
+
+def _csv_listing(root: str) -> list[tuple[str, str]]:
+    """_iter_csv_names(root) as a list, reused until the tree changes.
+
+    Creating, removing or renaming an entry bumps its directory's mtime, so
+    re-stat'ing the directories seen last time validates the listing without
+    scanning any of them. Sales, budtender and customer discovery all filter
+    the same listing.
+    """
+    cached = _listings.get(root)
+    if cached is not None:
+        dirs, files = cached
+        settled = time.time_ns() - _LISTING_SETTLE_NS
+        try:
+            if all(m < settled and os.stat(d).st_mtime_ns == m for d, m in dirs.items()):
+                return files
+        except OSError:
+            pass
+    dirs: dict[str, int] = {}
+    files = list(_iter_csv_names(root, dirs))
+    _listings[root] = (dirs, files)
+    return files
+
+
 def discover_csvs(
     inbox: Path = INBOX_FOLDER,
     keywords: list[str] | None = None,
@@ -48,24 +135,27 @@ def discover_csvs(
         # When using default sales keywords, exclude BT and customer files
         exclude_keywords = BT_PERFORMANCE_KEYWORDS + CUSTOMER_KEYWORDS
 
-    matches: list[Path] = []
+    matches: list[tuple[int, str]] = []
     if not inbox.exists():
-        return matches
+        return []
 
-    for csv_file in inbox.rglob("*.csv"):
-        filename_lower = csv_file.name.lower()
-        if exclude_keywords and any(ex in filename_lower for ex in exclude_keywords):
-            continue
-        if any(kw in filename_lower for kw in keywords):
-            matches.append(csv_file)
+    include_re = _keyword_re(tuple(keywords))
+    exclude_re = _keyword_re(tuple(exclude_keywords or ()))
+    if include_re is None:
+        return []
 
-    # Sort by file end-date descending (most recent export first)
-    def _sort_key(p: Path) -> str:
-        _, end = _parse_file_dates(p)
-        return end or "0000-00-00"
+    for path, name in _csv_listing(str(inbox)):
+        filename_lower = name.lower()
+        if exclude_re is not None and exclude_re.search(filename_lower):
+            continue
+        if include_re.search(filename_lower):
+            # End date parsed once, during the walk, as an integer sort key
+            matches.append((_end_date_key(name), path))
 
-    matches.sort(key=_sort_key, reverse=True)
-    return matches
+    # Sort by file end-date descending (most recent export first); stable, so
+    # files with the same end date keep their walk order
+    matches.sort(key=itemgetter(0), reverse=True)
+    return [Path(path) for _, path in matches]
 
 
 def discover_bt_csvs(inbox: Path = INBOX_FOLDER) -> list[Path]:
@@ -102,13 +192,118 @@ def _downcast_numerics(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# pandas' pyarrow engine tokenizes on several threads; optional, numpy-backed
+# result either way
+_ARROW_CSV = importlib.util.find_spec("pyarrow") is not None
+
+
+def _read_sales_csv(filepath: Path) -> pd.DataFrame:
+    """Read the COLUMN_MAP columns of one sales CSV with their declared dtypes."""
+    from app.config import COLUMN_MAP, COLUMN_DTYPES
+    if _ARROW_CSV:
+        # The Arrow reader takes no usecols callable — resolve it from the header
+        header = pd.read_csv(filepath, nrows=0).columns
+        usecols = [c for c in header if c in COLUMN_MAP]
+        try:
+            return pd.read_csv(
+                filepath, usecols=usecols, engine="pyarrow",
+                dtype={c: t for c, t in COLUMN_DTYPES.items() if c in usecols},
+            )
+        except Exception:
+            pass  # anything the Arrow reader rejects goes through the C parser
+    # memory_map: the C tokenizer reads the page cache directly instead of
+    # copying the file through Python-level buffered reads
+    return pd.read_csv(filepath, usecols=lambda c: c in COLUMN_MAP, dtype=COLUMN_DTYPES, memory_map=True)
+
+
+# ---------------------------------------------------------------------------
+# Per-file chunk cache — each parsed CSV, keyed on its (path, mtime, size)
+# ---------------------------------------------------------------------------
+
+# Month exports never change once written, so when one new file lands only
+# that file is parsed; the rest come back already normalised and categorised.
+_CHUNK_CACHE_DIR = BASE_FOLDER / ".cache" / "csv"
+_CHUNK_SUFFIX = ".parquet" if _ARROW_CSV else ".pkl"
+# Code that shapes a parsed chunk — editing any of it invalidates every entry
+_CHUNK_SOURCES = [
+    Path(__file__).parent.parent / "config.py",
+    Path(__file__),
+    Path(__file__).parent / "normalize.py",
+]
+
+
+def _chunk_cache_enabled() -> bool:
+    return os.environ.get("THRIVE_CACHE", "1") != "0"
+
+
+@lru_cache(maxsize=1)
+def _chunk_code_stamp() -> str:
+    return "|".join(f"{st.st_mtime_ns}:{st.st_size}" for st in (p.stat() for p in _CHUNK_SOURCES))
+
+
+def _chunk_cache_path(filepath: Path) -> Path:
+    st = filepath.stat()
+    key = f"{filepath.resolve()}|{st.st_mtime_ns}|{st.st_size}|{_chunk_code_stamp()}"
+    return _CHUNK_CACHE_DIR / (hashlib.sha1(key.encode()).hexdigest() + _CHUNK_SUFFIX)
+
+
+def _read_chunk(path: Path) -> pd.DataFrame | None:
+    try:
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path, engine="pyarrow")
+        return pd.read_pickle(path)
+    except Exception:
+        return None  # missing or unreadable — parse the CSV
+
+
+def _write_chunk(df: pd.DataFrame, path: Path) -> None:
+    try:
+        _CHUNK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        if path.suffix == ".parquet":
+            df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"  Warning: could not cache {path.name} ({e})")
+
+
+def _prune_chunk_cache(keep: set[str]) -> None:
+    """Drop cached chunks whose source file changed or disappeared."""
+    try:
+        entries = list(os.scandir(_CHUNK_CACHE_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name not in keep:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
 def load_single_csv(filepath: Path) -> pd.DataFrame:
-    """Load one CSV, normalise columns and categories, minimize memory."""
+    """Load one CSV, normalise columns and categories, minimize memory.
+
+    Served from the per-file chunk cache while the CSV is unchanged
+    (THRIVE_CACHE=0 disables it).
+    """
+    cache_path = _chunk_cache_path(filepath) if _chunk_cache_enabled() else None
+    if cache_path is not None:
+        cached = _read_chunk(cache_path)
+        if cached is not None:
+            return cached
+    df = _parse_single_csv(filepath)
+    if cache_path is not None:
+        _write_chunk(df, cache_path)
+    return df
+
+
+def _parse_single_csv(filepath: Path) -> pd.DataFrame:
     # Only read columns we actually use
-    from app.config import COLUMN_MAP
-    usecols = [c for c in COLUMN_MAP.keys()]
     try:
-        df = pd.read_csv(filepath, usecols=lambda c: c in usecols)
+        df = _read_sales_csv(filepath)
     except Exception:
         df = pd.read_csv(filepath)  # fallback if columns don't match
     df = normalize_columns(df)
@@ -117,14 +312,36 @@ def load_single_csv(filepath: Path) -> pd.DataFrame:
     # Downcast numeric types to save ~50% on numeric columns
     df = _downcast_numerics(df)
 
-    # Convert strings to category early to save memory during concat
-    for col in ["brand_clean", "store_clean", "category_clean", "product"]:
+    # Convert strings to category early to save memory during concat; the
+    # classifier inputs go too, so classification reads codes, not strings
+    for col in [
+        "brand_clean", "store_clean", "category_clean", "product",
+        "product_clean", "deals_upper", "inline_discounts",
+    ]:
         if col in df.columns:
             df[col] = df[col].astype("category")
 
     return df
 
 
+# Row "kinds" for the internal cost table, in np.select precedence order
+_COST_KINDS = ("pre_roll", "cart", "disposable", "flower_half_oz", "flower_eighth", "default")
+
+
+def _internal_cost_table() -> np.ndarray:
+    """(brand, kind) -> corrected unit cost; NaN where a brand has no price for that kind.
+
+    Brands priced by "default" fall back to it for every kind they don't list.
+    """
+    table = np.full((len(INTERNAL_BRAND_COSTS), len(_COST_KINDS)), np.nan, dtype="float32")
+    for i, prices in enumerate(INTERNAL_BRAND_COSTS.values()):
+        for j, kind in enumerate(_COST_KINDS):
+            price = prices.get(kind, prices.get("default"))
+            if price is not None:
+                table[i, j] = price
+    return table
+
+
 def apply_internal_cost_corrections(df: pd.DataFrame) -> pd.DataFrame:
     """Correct cost data for internal brands where Flowhub cost is unreliable.
 
@@ -135,77 +352,70 @@ def apply_internal_cost_corrections(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty or "year" not in df.columns:
         return df
 
-    total_corrected = 0
-    is_preroll = df["category_clean"].isin(PRE_ROLL_CATEGORIES)
-    is_cart = df["category_clean"].isin(CART_CATEGORIES)
-    is_disposable = df["category_clean"].isin(DISPOSABLE_CATEGORIES)
-    is_flower = df["category_clean"].isin(FLOWER_CATEGORIES)
-    # Detect half-ounce products by keyword in product name
-    product_upper = df["product"].str.upper() if "product" in df.columns else pd.Series("", index=df.index)
-    is_half_oz = product_upper.apply(lambda p: any(kw in p for kw in FLOWER_HALF_OZ_KEYWORDS))
-
-    for brand_upper, prices in INTERNAL_BRAND_COSTS.items():
-        brand_mask = df["brand_clean"].str.upper() == brand_upper
+    # Brand and product names are upper-cased and matched once per distinct value
+    brands = list(INTERNAL_BRAND_COSTS)
+    b_codes, b_uniq = _distinct(df["brand_clean"])
+    brand_idx = pd.Categorical(b_uniq.str.upper(), categories=brands).codes[b_codes]
+    internal = brand_idx >= 0
+    if not internal.any():
+        return df
 
-        # Iterate over all years present in the data (not just config keys)
-        # so new years (2027+) are automatically corrected via defaultdict
-        data_years = df.loc[brand_mask, "year"].unique()
-        for year_val in sorted(data_years):
-            mode = COST_CORRECTION_YEARS[year_val]
-            year_mask = brand_mask & (df["year"] == year_val)
-            if mode == "conditional":
-                year_mask = year_mask & (df["cost_per_item"] < 1.0)
-
-            count = year_mask.sum()
-            if count == 0:
-                continue
-
-            # Build per-unit cost based on which category keys exist in prices
-            if "flower_eighth" in prices:
-                # Multi-category pricing (e.g. SRENE: cart + flower with size variants)
-                new_cost_per_unit = pd.Series(0.0, index=df.index, dtype="float32")
-                applicable = pd.Series(False, index=df.index)
-                if "cart" in prices:
-                    new_cost_per_unit[is_cart] = prices["cart"]
-                    applicable = applicable | is_cart
-                if "disposable" in prices:
-                    new_cost_per_unit[is_disposable] = prices["disposable"]
-                    applicable = applicable | is_disposable
-                # Flower: half-ounce vs eighth (default flower)
-                is_flower_half = is_flower & is_half_oz
-                is_flower_eighth = is_flower & ~is_half_oz
-                new_cost_per_unit[is_flower_eighth] = prices["flower_eighth"]
-                new_cost_per_unit[is_flower_half] = prices["flower_half_oz"]
-                applicable = applicable | is_flower
-                # Only correct rows that match applicable categories
-                year_mask = year_mask & applicable
-                count = year_mask.sum()
-                if count == 0:
-                    continue
-            elif "cart" in prices:
-                # Cart/disposable pricing (FADE, RETREAT)
-                new_cost_per_unit = pd.Series(0.0, index=df.index, dtype="float32")
-                new_cost_per_unit[is_cart] = prices["cart"]
-                new_cost_per_unit[is_disposable] = prices["disposable"]
-                # Only correct rows that match cart or disposable categories
-                year_mask = year_mask & (is_cart | is_disposable)
-                count = year_mask.sum()
-                if count == 0:
-                    continue
-            else:
-                # Default/pre-roll pricing (HAUS, H&G, PISTOLA, G&G)
-                new_cost_per_unit = pd.Series(prices["default"], index=df.index, dtype="float32")
-                new_cost_per_unit = new_cost_per_unit.where(~is_preroll, float(prices["pre_roll"]))
-
-            new_cost = (df.loc[year_mask, "quantity"].astype("float32") * new_cost_per_unit[year_mask]).astype("float32")
-            df.loc[year_mask, "cost"] = new_cost
-            df.loc[year_mask, "cost_per_item"] = new_cost_per_unit[year_mask].astype("float32")
-            df.loc[year_mask, "net_profit"] = (df.loc[year_mask, "actual_revenue"] - new_cost).astype("float32")
-
-            total_corrected += count
-            print(f"  Cost correction: {brand_upper} {year_val} ({mode}) — {count:,} rows adjusted")
+    # Row kind per distinct category (flower defaults to an eighth), then
+    # half-ounce flower is split out by product name below
+    c_codes, c_uniq = _distinct(df["category_clean"])
+    eighth = _COST_KINDS.index("flower_eighth")
+    kind_lut = np.select(
+        [
+            c_uniq.isin(PRE_ROLL_CATEGORIES).to_numpy(),
+            c_uniq.isin(CART_CATEGORIES).to_numpy(),
+            c_uniq.isin(DISPOSABLE_CATEGORIES).to_numpy(),
+            c_uniq.isin(FLOWER_CATEGORIES).to_numpy(),
+        ],
+        [0, 1, 2, eighth],
+        default=len(_COST_KINDS) - 1,
+    )
+    kind_idx = kind_lut[c_codes]
 
+    # Detect half-ounce products by keyword in product name
+    if "product" in df.columns:
+        half_oz_re = "|".join(re.escape(kw) for kw in FLOWER_HALF_OZ_KEYWORDS)
+        p_codes, p_uniq = _distinct(df["product"])
+        is_half_oz = p_uniq.str.upper().str.contains(half_oz_re, na=False).to_numpy(dtype=bool)[p_codes]
+    else:
+        is_half_oz = np.zeros(len(df), dtype=bool)
+    kind_idx[(kind_idx == eighth) & is_half_oz] = _COST_KINDS.index("flower_half_oz")
+
+    # Per-row corrected unit cost: one gather from the small (brand, kind) table
+    unit_cost = np.full(len(df), np.nan, dtype="float32")
+    unit_cost[internal] = _internal_cost_table()[brand_idx[internal], kind_idx[internal]]
+
+    # Year modes resolved once per distinct year, not per row
+    year = df["year"]
+    conditional_years = [y for y in year.dropna().unique() if COST_CORRECTION_YEARS[y] == "conditional"]
+    fix = ~np.isnan(unit_cost) & year.notna().to_numpy()
+    if conditional_years:
+        fix &= ~year.isin(conditional_years).to_numpy() | (df["cost_per_item"] < 1.0).to_numpy()
+
+    total_corrected = int(fix.sum())
     if total_corrected:
+        # Plain array writes: no index alignment, and float32 stays float32
+        new_cost_per_unit = unit_cost[fix]
+        new_cost = df["quantity"].to_numpy()[fix].astype("float32") * new_cost_per_unit
+        updates = {
+            "cost": new_cost,
+            "cost_per_item": new_cost_per_unit,
+            "net_profit": df["actual_revenue"].to_numpy()[fix] - new_cost,
+        }
+        for col, values in updates.items():
+            column = df[col].to_numpy(copy=True)
+            column[fix] = values
+            df[col] = column
+
+        fixed = pd.DataFrame({"brand": brand_idx[fix], "year": year[fix].to_numpy()})
+        counts = fixed.groupby(["brand", "year"]).size()
+        for (b, year_val), count in counts.items():
+            mode = COST_CORRECTION_YEARS[year_val]
+            print(f"  Cost correction: {brands[b]} {year_val} ({mode}) — {count:,} rows adjusted")
         print(f"  Total cost corrections: {total_corrected:,} rows across {len(INTERNAL_BRAND_COSTS)} brands")
 
     return df
@@ -214,6 +424,146 @@ def apply_internal_cost_corrections(df: pd.DataFrame) -> pd.DataFrame:
 _DEDUP_COLS = ["receipt_id", "product", "completed_at"]
 
 
+class _SeenRows:
+    """Streaming keep="first" dedup index over _DEDUP_COLS.
+
+    Each kept row's fingerprint (hash_pandas_object) lives in a sorted uint64
+    array, so a new file costs O(chunk log n) lookups instead of re-hashing
+    every row kept so far. A fingerprint hit is confirmed against the earlier
+    rows' actual keys before anything is dropped — a collision can't lose a sale.
+    """
+
+    def __init__(self) -> None:
+        self._fps = np.empty(0, dtype=np.uint64)  # sorted fingerprints
+        self._ids = np.empty(0, dtype=np.int64)   # kept-row id for each fingerprint
+        self._keys: list[pd.DataFrame] = []       # key columns of each kept batch
+        self._starts: list[int] = []              # kept-row id of each batch's first row
+
+    @staticmethod
+    def _fingerprint(keys: pd.DataFrame) -> np.ndarray:
+        # Ints and floats hash differently but compare equal; hash one width
+        rid = keys["receipt_id"]
+        if pd.api.types.is_numeric_dtype(rid) and rid.dtype != np.float64:
+            keys = keys.assign(receipt_id=rid.astype(np.float64))
+        return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+    def _rows(self, ids: np.ndarray) -> pd.DataFrame:
+        batch = np.searchsorted(self._starts, ids, side="right") - 1
+        return pd.concat(
+            [self._keys[b].iloc[ids[batch == b] - self._starts[b]] for b in np.unique(batch)],
+            ignore_index=True,
+        )
+
+    def add(self, keys: pd.DataFrame) -> np.ndarray:
+        """Return the mask of rows in `keys` not seen before, and remember them."""
+        new = ~keys.duplicated(keep="first").to_numpy()
+        fps = self._fingerprint(keys)
+        if len(self._fps):
+            lo = np.searchsorted(self._fps, fps, side="left")
+            hi = np.searchsorted(self._fps, fps, side="right")
+            hits = np.flatnonzero(new & (hi > lo))
+            if len(hits):
+                # Every kept row sharing a hit's fingerprint, as flat positions
+                n = hi[hits] - lo[hits]
+                pos = np.repeat(lo[hits] - np.cumsum(n) + n, n) + np.arange(n.sum())
+                prior = self._rows(self._ids[pos])
+                both = pd.concat([prior, keys.iloc[hits]], ignore_index=True)
+                new[hits[both.duplicated(keep="first").to_numpy()[len(prior):]]] = False
+
+        kept_fps = fps[new]
+        order = np.argsort(kept_fps, kind="stable")
+        start = self._starts[-1] + len(self._keys[-1]) if self._keys else 0
+        at = np.searchsorted(self._fps, kept_fps[order])
+        self._fps = np.insert(self._fps, at, kept_fps[order])
+        self._ids = np.insert(self._ids, at, start + order)
+        self._keys.append(keys[new])
+        self._starts.append(start)
+        return new
+
+
+def _fork_context():
+    """The "fork" multiprocessing context when forking is safe here, else None.
+
+    Linux only (macOS has fork but CPython defaults to spawn there for a
+    reason), and only while this is the process's sole thread: the API's
+    /reload runs load() on a background thread beside the upload IO pool,
+    and a forked child can inherit a lock another thread holds.
+    """
+    import multiprocessing
+    import threading
+
+    if not sys.platform.startswith("linux") or threading.active_count() > 1:
+        return None
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _iter_loaded(files: list[Path]):
+    """Yield (file, chunk, error) in `files` order.
+
+    With spare CPUs and a safe fork (see _fork_context) the files are parsed
+    on worker processes, at most one per worker ahead of the consumer, so
+    peak memory stays bounded by the in-flight chunks rather than the whole
+    inbox. Anywhere else — the API server included — they load serially.
+    """
+    workers = min(os.cpu_count() or 1, len(files))
+    ctx = _fork_context() if workers > 1 else None
+    if ctx is None:
+        for f in files:
+            try:
+                yield f, load_single_csv(f), None
+            except Exception as exc:
+                yield f, None, exc
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+        queued = iter(files)
+        pending = deque((f, ex.submit(load_single_csv, f)) for f in islice(queued, workers))
+        while pending:
+            f, fut = pending.popleft()
+            nxt = next(queued, None)
+            if nxt is not None:
+                pending.append((nxt, ex.submit(load_single_csv, nxt)))
+            try:
+                yield f, fut.result(), None
+            except Exception as exc:
+                yield f, None, exc
+
+
+def _concat_chunks(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat that keeps the per-file categoricals categorical.
+
+    Plain concat decays categoricals with differing categories to object,
+    materialising a Python string per row only for the store to hash them
+    back into categories. Recoding every chunk onto the sorted union first
+    keeps the codes; unused labels (rows lost to dedup) are then dropped, so
+    the categories match what astype("category") would have built.
+    """
+    from pandas.api.types import union_categoricals
+
+    def recodable(col: str) -> bool:
+        # An all-blank column parses as float, and union_categoricals needs
+        # one categories dtype; mixed columns fall back to plain concat
+        dtypes = [ch[col].dtype if col in ch.columns else None for ch in chunks]
+        return all(isinstance(d, pd.CategoricalDtype) for d in dtypes) and len(
+            {d.categories.dtype for d in dtypes}
+        ) == 1
+
+    shared = [col for col in chunks[0].columns if recodable(col)]
+    for col in shared:
+        cats = union_categoricals([ch[col] for ch in chunks], sort_categories=True).categories
+        for ch in chunks:
+            ch[col] = ch[col].cat.set_categories(cats)
+    df = pd.concat(chunks, ignore_index=True)
+    for col in shared:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
 def load_all_csvs(
     inbox: Path = INBOX_FOLDER,
     keywords: list[str] | None = None,
@@ -233,35 +583,56 @@ def load_all_csvs(
     if not files:
         return pd.DataFrame()
 
-    df = None
+    kept: list[pd.DataFrame] = []
+    seen = _SeenRows()
+    unique_rows = 0
     total_loaded = 0
     file_count = 0
     skipped_files = []
-    for f in files:
-        try:
-            chunk = load_single_csv(f)
-            rows = len(chunk)
-            total_loaded += rows
-            file_count += 1
-
-            if df is None:
-                df = chunk
-                df = df.drop_duplicates(subset=_DEDUP_COLS, keep="first")
-                print(f"  [{file_count}/{len(files)}] {f.name}: {rows:,} rows → {len(df):,} unique")
-            else:
-                df = pd.concat([df, chunk], ignore_index=True)
+    # Chunks arrive in recency order whether parsed inline or on workers, so
+    # the keep="first" dedup below still favours the most recent export.
+    # Everything the loop allocates is freed by refcount; automatic gc passes
+    # would only re-walk the growing heap, so collection is paused meanwhile.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for f, chunk, error in _iter_loaded(files):
+            try:
+                if error is not None:
+                    raise error
+                rows = len(chunk)
+                total_loaded += rows
+                file_count += 1
+
+                # Dedup immediately: rows already seen (from more-recent files) are
+                # kept. Only this file's key columns are hashed; the wide frame is
+                # concatenated once, after the loop.
+                new_rows = seen.add(chunk[_DEDUP_COLS])
+                added = int(new_rows.sum())
+                kept.append(chunk if added == rows else chunk[new_rows])
                 del chunk
+                unique_rows += added
+
+                if file_count == 1:
+                    print(f"  [{file_count}/{len(files)}] {f.name}: {rows:,} rows → {unique_rows:,} unique")
+                else:
+                    dropped = rows - added
+                    print(f"  [{file_count}/{len(files)}] {f.name}: +{rows:,}, dedup -{dropped:,} → {unique_rows:,} rows")
+
+            except Exception as exc:
+                skipped_files.append({"file": f.name, "error": str(exc)})
+                print(f"  WARNING: skipping {f.name}: {exc}")
+    finally:
+        if gc_was_enabled:
+            gc.enable()
 
-                # Dedup immediately: rows already in df (from more-recent files) are kept
-                pre = len(df)
-                df = df.drop_duplicates(subset=_DEDUP_COLS, keep="first")
-                dropped = pre - len(df)
-                gc.collect()
-                print(f"  [{file_count}/{len(files)}] {f.name}: +{rows:,}, dedup -{dropped:,} → {len(df):,} rows")
+    df = None
+    if kept:
+        df = kept[0] if len(kept) == 1 else _concat_chunks(kept)
+        del kept, seen
 
-        except Exception as exc:
-            skipped_files.append({"file": f.name, "error": str(exc)})
-            print(f"  WARNING: skipping {f.name}: {exc}")
+    if keywords is None and _chunk_cache_enabled():
+        _prune_chunk_cache({_chunk_cache_path(f).name for f in files})
 
     if skipped_files:
         print(f"\n  ⚠ {len(skipped_files)} file(s) failed to load:")
@@ -275,8 +646,7 @@ def load_all_csvs(
     print(f"  Total: {total_loaded:,} raw rows from {file_count} files → {post_dedup:,} unique rows")
 
     # Classify transactions (vectorized for speed and memory)
-    df["transaction_type"] = _classify_transactions_vectorized(df)
-    df["deal_type"] = _classify_deal_types_vectorized(df)
+    df["transaction_type"], df["deal_type"] = _classify_vectorized(df)
 
     # Apply internal brand cost corrections (2024 + 2025)
     df = apply_internal_cost_corrections(df)
@@ -293,33 +663,93 @@ def load_all_csvs(
     return df
 
 
-def _classify_transactions_vectorized(df: pd.DataFrame) -> pd.Series:
-    """Vectorized transaction classification — much faster than row-by-row apply."""
-    deals = df["deals_upper"].fillna("")
-    product = df.get("product_clean", pd.Series("", index=df.index)).fillna("")
-    actual_rev = df["actual_revenue"].fillna(0)
+_REWARD_RE = re.compile("REWARD|POINT|REDEMPTION")
+_MARKOUT_RE = re.compile("MARKOUT|MARK OUT|MARK-OUT")
+_BUNDLE_RE = re.compile(r"B1G|B2G|BOGO|2 FOR|3 FOR|4 FOR|5 FOR|2/\$|3/\$|4/\$|5/\$")
+_PERCENT_RE = re.compile("%|PERCENT")
+_CUSTOMER_DEAL_RE = re.compile("SENIOR|VETERAN|MILITARY|MEDICAL|INDUSTRY|VIP|EMPLOYEE")
+_PRICE_DEAL_RE = re.compile(r"FOR \$|FOR\$")
+
 
-    result = pd.Series("REGULAR", index=df.index)
-    result[deals.str.contains("REWARD|POINT|REDEMPTION", regex=True, na=False)] = "REWARD"
-    result[deals.str.contains("MARKOUT|MARK OUT|MARK-OUT", regex=True, na=False)] = "MARKOUT"
-    result[product.str.contains("TESTER", na=False) | deals.str.contains("TESTER", na=False)] = "TESTER"
-    result[(actual_rev <= 1.00) & ~product.str.contains("EXIT BAG", na=False) & (result == "REGULAR")] = "COMP"
-    return result
+def _distinct(values: pd.Series) -> tuple[np.ndarray, pd.Series]:
+    """(codes, uniques) — deal and product strings repeat heavily, so the
+    substring tests run once per distinct value and broadcast back by code.
+
+    Missing values get their own "" entry, so every code indexes uniques.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    missing = codes < 0
+    if missing.any():
+        codes[missing] = len(uniques)
+        uniques = pd.concat([uniques, pd.Series([""], dtype=object)], ignore_index=True)
+    return codes, uniques
+
+
+_TRANSACTION_LABELS = np.array(["TESTER", "MARKOUT", "REWARD", "COMP", "REGULAR"], dtype=object)
+_DEAL_LABELS = np.array(["NO DEAL", "BUNDLE", "PERCENT OFF", "CUSTOMER DISCOUNT", "PRICE DEAL", "OTHER"], dtype=object)
+
+
+def _label_categorical(label_codes: np.ndarray, labels: np.ndarray, index: pd.Index) -> pd.Series:
+    """Categorical of labels[label_codes] with the sorted, observed categories
+    astype("category") would have built — without materialising N strings."""
+    present = np.flatnonzero(np.bincount(label_codes, minlength=len(labels)))
+    order = present[np.argsort(labels[present])]
+    remap = np.empty(len(labels), dtype=np.int8)
+    remap[order] = np.arange(len(order))
+    return pd.Series(pd.Categorical.from_codes(remap[label_codes], categories=labels[order]), index=index)
 
 
-def _classify_deal_types_vectorized(df: pd.DataFrame) -> pd.Series:
-    """Vectorized deal type classification."""
-    deals = df["deals_upper"].fillna("")
-    inline = df.get("inline_discounts", pd.Series("", index=df.index)).fillna("").astype(str).str.upper()
-    combined = deals + " " + inline
+def _classify_vectorized(df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    """(transaction_type, deal_type) as categoricals — much faster than row-by-row apply.
 
-    result = pd.Series("OTHER", index=df.index)
-    result[(deals == "") & (inline == "")] = "NO DEAL"
-    result[combined.str.contains("B1G|B2G|BOGO|2 FOR|3 FOR|4 FOR|5 FOR|2/\\$|3/\\$|4/\\$|5/\\$", regex=True, na=False)] = "BUNDLE"
-    result[combined.str.contains("%|PERCENT", regex=True, na=False) & (result == "OTHER")] = "PERCENT OFF"
-    result[combined.str.contains("SENIOR|VETERAN|MILITARY|MEDICAL|INDUSTRY|VIP|EMPLOYEE", regex=True, na=False) & (result == "OTHER")] = "CUSTOMER DISCOUNT"
-    result[combined.str.contains("FOR \\$|FOR\\$", regex=True, na=False) & (result == "OTHER")] = "PRICE DEAL"
-    return result
+    deals_upper is factorized once and shared by both classifiers; every
+    keyword test runs on distinct strings only.
+    """
+    deals = df["deals_upper"]
+    product = df.get("product_clean", pd.Series("", index=df.index))
+    inline = df.get("inline_discounts", pd.Series("", index=df.index))
+    actual_rev = df["actual_revenue"].fillna(0)
+
+    d_codes, d_uniq = _distinct(deals)
+    p_codes, p_uniq = _distinct(product)
+    i_codes, i_uniq = _distinct(inline)
+    i_uniq = i_uniq.astype(str).str.upper()
+
+    # --- Transaction type: later rules override earlier ones, so the
+    # precedence is TESTER > MARKOUT > REWARD > COMP > REGULAR
+    is_reward = d_uniq.str.contains(_REWARD_RE, na=False).to_numpy()[d_codes]
+    is_markout = d_uniq.str.contains(_MARKOUT_RE, na=False).to_numpy()[d_codes]
+    is_tester = (
+        p_uniq.str.contains("TESTER", regex=False, na=False).to_numpy()[p_codes]
+        | d_uniq.str.contains("TESTER", regex=False, na=False).to_numpy()[d_codes]
+    )
+    is_comp = (actual_rev <= 1.00).to_numpy() & ~p_uniq.str.contains("EXIT BAG", regex=False, na=False).to_numpy()[p_codes]
+    tx_codes = np.select([is_tester, is_markout, is_reward, is_comp], [0, 1, 2, 3], 4)
+
+    # --- Deal type depends only on "deals inline"; build that string per
+    # distinct (deals, inline) pair rather than per row
+    pair_codes, pairs = pd.factorize(d_codes.astype(np.int64) * len(i_uniq) + i_codes)
+    combined = pd.Series(
+        d_uniq.to_numpy()[pairs // len(i_uniq)] + " " + i_uniq.to_numpy()[pairs % len(i_uniq)],
+        dtype=object,
+    )
+    deal_lut = np.select(
+        [
+            (combined == " ").to_numpy(),  # neither column had a deal
+            combined.str.contains(_BUNDLE_RE, na=False).to_numpy(),
+            combined.str.contains(_PERCENT_RE, na=False).to_numpy(),
+            combined.str.contains(_CUSTOMER_DEAL_RE, na=False).to_numpy(),
+            combined.str.contains(_PRICE_DEAL_RE, na=False).to_numpy(),
+        ],
+        [0, 1, 2, 3, 4],
+        5,
+    )
+
+    return (
+        _label_categorical(tx_codes, _TRANSACTION_LABELS, df.index),
+        _label_categorical(deal_lut[pair_codes], _DEAL_LABELS, df.index),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -332,21 +762,23 @@ def load_bt_performance(filepath: Path) -> pd.DataFrame:
     currency_cols = ["Average Cart Value (pre-tax)", "Sales (pre-tax)", "Upsell Total Price", "Upsell Total Profit"]
     for col in currency_cols:
         if col in df.columns:
-            df[col] = df[col].replace(r"[\$,]", "", regex=True).astype(float)
+            df[col] = parse_number(df[col])
     if "% of Sales Discounted" in df.columns:
-        df["% of Sales Discounted"] = df["% of Sales Discounted"].replace(r"%", "", regex=True).astype(float)
+        df["% of Sales Discounted"] = parse_number(df["% of Sales Discounted"], strip="%")
     return df
 
 
+_CUSTOMER_COLUMNS = {
+    "ID": "customer_id",
+    "Name": "customer_name",
+    "Groups": "groups",
+    "Loyal": "is_loyal",
+    "Loyalty Points": "loyalty_points",
+}
+
+
 def load_customer_attributes(filepath: Path) -> pd.DataFrame:
-    """Load a customer attributes CSV."""
-    df = pd.read_csv(filepath)
-    col_map = {
-        "ID": "customer_id",
-        "Name": "customer_name",
-        "Groups": "groups",
-        "Loyal": "is_loyal",
-        "Loyalty Points": "loyalty_points",
-    }
-    df = df.rename(columns=col_map)
+    """Load a customer attributes CSV (only the columns that get renamed)."""
+    df = pd.read_csv(filepath, usecols=lambda c: c in _CUSTOMER_COLUMNS)
+    df = df.rename(columns=_CUSTOMER_COLUMNS)
     return df
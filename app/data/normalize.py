@@ -15,6 +15,34 @@ from app.config import COLUMN_MAP, CURRENCY_COLS, CATEGORY_NORMALIZATION, CUSTOM
 # Column normalisation
 # ---------------------------------------------------------------------------
 
+# " - RD<digits>" suffix stripped from raw store names
+_STORE_RD_RE = re.compile(r" - RD\d+")
+
+
+def parse_number(values: pd.Series, strip: str = "$,") -> pd.Series:
+    """Float column from text like "$1,234.50"; numeric input is just cast.
+
+    One str.translate pass deletes every `strip` character — no regex VM
+    and no intermediate column per character. Any non-numeric dtype (object,
+    or the string dtype pandas 3 infers for text) takes the strip path.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    return values.astype("string").str.translate(str.maketrans("", "", strip)).astype(float)
+
+
+def _clean_categorical(values: pd.Series, clean) -> pd.Series:
+    """clean() applied once per distinct value; the result is a categorical.
+
+    Store, brand, category and deal strings repeat across thousands of rows,
+    so the string work runs on the uniques and rows only carry codes.
+    """
+    codes, uniques = pd.factorize(values)
+    cleaned = pd.Categorical(clean(pd.Series(uniques, dtype=object)))
+    row_codes = np.where(codes >= 0, cleaned.codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(row_codes, dtype=cleaned.dtype), index=values.index)
+
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Rename raw Flowhub columns, parse types, add derived columns."""
     df = df.rename(columns=COLUMN_MAP)
@@ -22,39 +50,45 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # Currency columns → float
     for col in CURRENCY_COLS:
         if col in df.columns:
-            df[col] = df[col].replace(r"[\$,]", "", regex=True).astype(float)
+            df[col] = parse_number(df[col])
 
     # Datetime
     df["completed_at"] = pd.to_datetime(
-        df["completed_at"], format="%m/%d/%Y %I:%M:%S %p", errors="coerce"
+        df["completed_at"], format="%m/%d/%Y %I:%M:%S %p", errors="coerce", cache=True
     )
     n_before = len(df)
     df = df.dropna(subset=["completed_at"])
     n_dropped = n_before - len(df)
     if n_dropped:
         print(f"  Warning: {n_dropped:,} rows dropped (unparseable dates)")
-    df["sale_date"] = df["completed_at"].dt.date
+    # Midnight of the sale day as datetime64 (8 bytes/row), not date objects
+    df["sale_date"] = df["completed_at"].dt.normalize()
 
-    # Clean strings
-    df["store_clean"] = df["store"].str.replace(r" - RD\d+", "", regex=True).str.strip()
-    df["brand_clean"] = df["brand"].str.strip()
+    # Clean strings (as categoricals, cleaned per distinct value)
+    df["store_clean"] = _clean_categorical(
+        df["store"], lambda s: s.str.replace(_STORE_RD_RE, "", regex=True).str.strip()
+    )
+    df["brand_clean"] = _clean_categorical(df["brand"], lambda s: s.str.strip())
     if "category" in df.columns:
-        df["category_clean"] = df["category"].str.strip().str.upper()
+        df["category_clean"] = _clean_categorical(df["category"], lambda s: s.str.strip().str.upper())
     else:
         df["category_clean"] = "UNKNOWN"
     if "product" in df.columns:
-        df["product_clean"] = df["product"].str.strip().str.upper()
+        df["product_clean"] = _clean_categorical(df["product"], lambda s: s.str.strip().str.upper())
     else:
         df["product_clean"] = ""
 
     # Deal helpers
-    df["deals_upper"] = df["deals_used"].fillna("").str.upper()
+    df["deals_upper"] = _clean_categorical(df["deals_used"].fillna(""), lambda s: s.str.upper())
     df["has_discount"] = df["discounts"] > 0
 
-    # Year/month for period grouping
-    df["year"] = df["completed_at"].dt.year
-    df["month"] = df["completed_at"].dt.month
-    df["year_month"] = df["completed_at"].dt.to_period("M")
+    # Year/month for period grouping: one calendar conversion to monthly
+    # periods, then integer arithmetic on the months-since-1970 ordinals
+    year_month = df["completed_at"].dt.to_period("M")
+    months = year_month.array.asi8
+    df["year"] = months // 12 + 1970
+    df["month"] = months % 12 + 1
+    df["year_month"] = year_month
 
     return df
 
@@ -65,7 +99,10 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 def normalize_categories(df: pd.DataFrame) -> pd.DataFrame:
     """Map variant category aliases to canonical names."""
-    df["category_clean"] = df["category_clean"].replace(CATEGORY_NORMALIZATION)
+    # Hash lookup per distinct value; unmapped categories keep their own name
+    df["category_clean"] = _clean_categorical(
+        df["category_clean"], lambda cats: cats.map(CATEGORY_NORMALIZATION).fillna(cats)
+    )
     return df
 
 
@@ -125,6 +162,20 @@ def get_customer_segment(groups: str) -> str:
     return "Other Group"
 
 
+def get_customer_segments(groups: pd.Series) -> pd.Series:
+    """Vectorised get_customer_segment over a Series of group-membership strings.
+
+    Keywords are tested in CUSTOMER_SEGMENTS order and the first hit wins, as
+    in the scalar version (not the leftmost match in the string).
+    """
+    g = groups.astype(object)
+    missing = g.isna() | (g == "")
+    upper = g.where(~missing, "").astype(str).str.upper()
+    hits = [upper.str.contains(kw, regex=False).to_numpy() for kw, _ in CUSTOMER_SEGMENTS]
+    segment = np.select(hits, [seg for _, seg in CUSTOMER_SEGMENTS], default="Other Group")
+    return pd.Series(np.where(missing, "Regular", segment), index=groups.index, dtype=object)
+
+
 # ---------------------------------------------------------------------------
 # Reward name extraction
 # ---------------------------------------------------------------------------
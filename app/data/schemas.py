@@ -6,6 +6,7 @@ from __future__ import annotations
 import datetime as dt
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 from typing import Optional
 
 
@@ -18,9 +19,13 @@ class PeriodType(str, Enum):
     ALL = "all"
 
 
-@dataclass
+@dataclass(frozen=True)
 class PeriodFilter:
-    """Defines a date range for filtering sales data."""
+    """Defines a date range for filtering sales data.
+
+    Immutable, so resolve() and label are computed once per instance; use
+    dataclasses.replace() to derive a variant.
+    """
     period_type: PeriodType = PeriodType.ALL
     year: Optional[int] = None
     month: Optional[int] = None          # 1-12
@@ -36,6 +41,10 @@ class PeriodFilter:
 
     def resolve(self) -> tuple[Optional[dt.date], Optional[dt.date]]:
         """Return (start_date, end_date) based on period_type."""
+        return self._bounds
+
+    @cached_property
+    def _bounds(self) -> tuple[Optional[dt.date], Optional[dt.date]]:
         if self.period_type == PeriodType.ALL:
             return None, None
 
@@ -82,7 +91,7 @@ class PeriodFilter:
 
         return None, None
 
-    @property
+    @cached_property
     def label(self) -> str:
         """Human-readable label for the period."""
         if self.period_type == PeriodType.ALL:
@@ -7,53 +7,256 @@ Designed so swapping to Parquet/SQLite later only changes load() and query metho
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import astuple
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
-from app.config import INBOX_FOLDER
+from app.config import BASE_FOLDER, INBOX_FOLDER
 from app.data.loader import (
     load_all_csvs,
+    discover_csvs,
     discover_bt_csvs,
     discover_customer_csvs,
     load_bt_performance,
     load_customer_attributes,
 )
+from app.data.normalize import _clean_categorical
 from app.data.schemas import PeriodFilter
 
 
+# ----------------------------------------------------------------------
+# Snapshot cache — the prepared sales frame, keyed on the input CSVs
+# ----------------------------------------------------------------------
+
+# Bump when the prepared frame's shape changes in a way file stats can't see
+_SNAPSHOT_VERSION = "1"
+_SNAPSHOT_DIR = BASE_FOLDER / ".cache"
+# Code that shapes the cached frame — editing any of it invalidates the snapshot
+_SNAPSHOT_SOURCES = [
+    Path(__file__).parent.parent / "config.py",
+    Path(__file__).parent / "loader.py",
+    Path(__file__).parent / "normalize.py",
+    Path(__file__),
+]
+
+# Columns load() stores as categoricals
+_CATEGORY_COLUMNS = [
+    "brand_clean", "store_clean", "category_clean", "product",
+    "transaction_type", "deal_type", "order_type", "year_month",
+    # Raw string columns still needed by reports
+    "sold_by", "store", "brand", "category", "deals_used",
+    # High-cardinality but still fewer unique than rows → big savings
+    "customer_id", "customer_name", "receipt_id",
+]
+
+# Parquet when pyarrow is installed; pickle round-trips the same dtypes without it
+_SNAPSHOT_SUFFIX = ".parquet" if importlib.util.find_spec("pyarrow") is not None else ".pkl"
+
+
+def _snapshot_enabled() -> bool:
+    return os.environ.get("THRIVE_CACHE", "1") != "0"
+
+
+def _snapshot_fingerprint(inbox: Path) -> str:
+    """sha256 over (path, mtime, size) of every sales CSV plus the loader sources."""
+    h = hashlib.sha256(f"{_SNAPSHOT_VERSION}|{inbox.resolve()}".encode())
+    for p in [*discover_csvs(inbox), *_SNAPSHOT_SOURCES]:
+        st = p.stat()
+        h.update(f"|{p}|{st.st_mtime_ns}|{st.st_size}".encode())
+    return h.hexdigest()
+
+
+def _snapshot_path(fingerprint: str) -> Path:
+    # The fingerprint is part of the name, so a frame can never be paired
+    # with another load's fingerprint
+    return _SNAPSHOT_DIR / f"store-{fingerprint}{_SNAPSHOT_SUFFIX}"
+
+
+def _periods_to_ordinals(df: pd.DataFrame) -> pd.DataFrame:
+    """year_month as int64 month ordinals — Parquet can't store Periods."""
+    if "year_month" not in df.columns:
+        return df
+    ym = df["year_month"].cat
+    return df.assign(year_month=ym.categories.asi8[ym.codes.to_numpy()])
+
+
+def _ordinals_to_periods(df: pd.DataFrame) -> pd.DataFrame:
+    """Inverse of _periods_to_ordinals: the sorted-category Period column load() builds."""
+    if "year_month" not in df.columns:
+        return df
+    periods = pd.arrays.PeriodArray(df["year_month"].to_numpy(dtype="int64"), dtype=pd.PeriodDtype("M"))
+    df["year_month"] = pd.Categorical(periods)
+    return df
+
+
+def _restore_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Parquet returns a categorical with no categories (an all-blank column) as object."""
+    for col in _CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _read_snapshot(fingerprint: str) -> Optional[pd.DataFrame]:
+    """Cached frame if one exists for this fingerprint, else None."""
+    path = _snapshot_path(fingerprint)
+    try:
+        if path.suffix == ".parquet":
+            return _restore_categoricals(_ordinals_to_periods(pd.read_parquet(path, engine="pyarrow")))
+        return pd.read_pickle(path)
+    except Exception:
+        # Missing or unreadable — fall back to a full CSV load
+        return None
+
+
+def _write_snapshot(df: pd.DataFrame, fingerprint: str) -> None:
+    """Atomically publish the snapshot for this fingerprint, then drop older ones."""
+    path = _snapshot_path(fingerprint)
+    try:
+        _SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        # pid-unique temp name — concurrent loaders (API server, CLI) never share one
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        if path.suffix == ".parquet":
+            _periods_to_ordinals(df).to_parquet(tmp, engine="pyarrow", compression="zstd")
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"  Warning: could not write snapshot cache ({e})")
+        return
+    # Superseded snapshots (and the old store.<ext> + store.fingerprint pair);
+    # another process's in-flight .tmp is left alone
+    for old in _SNAPSHOT_DIR.glob("store*"):
+        if old != path and old.suffix != ".tmp":
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+# Period row-position arrays kept per store (8 bytes/row each, so few)
+_PERIOD_INDEX_CACHE = 8
+# Small per-period answers (date range strings, category margins) kept per store
+_PERIOD_RESULT_CACHE = 64
+_NO_ROWS = np.empty(0, dtype=np.intp)
+
+
+def _month_bounds(period: PeriodFilter) -> Optional[tuple[int, int]]:
+    """Inclusive (YYYYMM, YYYYMM) span of a month-aligned period, else None.
+
+    Mirrors the integer year/month branches of DataStore._period_mask; ALL,
+    CUSTOM and incomplete periods return None.
+    """
+    from app.data.schemas import PeriodType
+
+    p = period
+    if p.period_type == PeriodType.MONTH and p.year and p.month:
+        return p.year * 100 + p.month, p.year * 100 + p.month
+    if p.period_type == PeriodType.QUARTER and p.year and p.quarter:
+        m_start = (p.quarter - 1) * 3 + 1
+        return p.year * 100 + m_start, p.year * 100 + m_start + 2
+    if p.period_type == PeriodType.RANGE and p.start_year and p.start_month and p.end_year and p.end_month:
+        return p.start_year * 100 + p.start_month, p.end_year * 100 + p.end_month
+    if p.period_type == PeriodType.YEAR and p.year:
+        return p.year * 100 + 1, p.year * 100 + 12
+    return None
+
+
 class DataStore:
     """In-memory sales data with period-filtered accessors."""
 
     def __init__(self) -> None:
+        self._memo: dict = {}
+        self._period_lock = threading.Lock()
         self.df: pd.DataFrame = pd.DataFrame()
         self.bt_df: Optional[pd.DataFrame] = None
         self.cust_attr_df: Optional[pd.DataFrame] = None
         self._loaded = False
 
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame) -> None:
+        # Derived results (regular rows, brand list, date ranges) belong to
+        # the frame they were computed from
+        self._df = value
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop everything derived from df (row indexes, lookups).
+
+        Assigning df does this; call it after mutating df's columns in place.
+        """
+        # A fresh dict rather than clear(): a computation still running
+        # against the old frame stores its result where nobody looks
+        self._memo = {}
+
+    def _memoized(self, key, compute):
+        """Return compute(), cached against the current frame under key."""
+        memo = self._memo
+        try:
+            return memo[key]
+        except KeyError:
+            value = memo[key] = compute()
+            return value
+
+    def _memoized_by_period(self, name, period, compute, size):
+        """compute(), cached per period in an LRU of the last size periods.
+
+        Periods come from API requests (arbitrary custom ranges on a
+        long-running server), so unlike _memoized these caches are bounded.
+        """
+        cache = self._memoized(name, OrderedDict)
+        key = None if period is None else astuple(period)
+        with self._period_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = compute()
+        with self._period_lock:
+            cache[key] = value
+            if len(cache) > size:
+                cache.popitem(last=False)
+        return value
+
     # ------------------------------------------------------------------
     # Loading
     # ------------------------------------------------------------------
 
     def load(self, inbox: Path = INBOX_FOLDER) -> "DataStore":
-        """Load all CSVs from inbox, deduplicate, classify."""
+        """Load all CSVs from inbox, deduplicate, classify.
+
+        The prepared frame is snapshotted under BASE_FOLDER/.cache and reused
+        while the input CSVs are unchanged (THRIVE_CACHE=0 disables this).
+        """
         print("Loading sales data...")
-        self.df = load_all_csvs(inbox)
+        fingerprint = _snapshot_fingerprint(inbox) if _snapshot_enabled() else None
+        cached = _read_snapshot(fingerprint) if fingerprint else None
+        if cached is not None:
+            self.df = cached
+            print(f"  Loaded {len(self.df):,} rows from snapshot cache")
+        else:
+            self.df = load_all_csvs(inbox)
 
         if self.df.empty:
             print("  No sales CSVs found — starting with empty dataset")
+        elif cached is not None:
+            regular_count = int((self.df["transaction_type"] == "REGULAR").sum())
+            print(f"  {regular_count:,} regular transactions (of {len(self.df):,} total)")
         else:
             import gc
             # Convert string columns to categorical dtype to save ~60% RAM
-            cat_cols = [
-                "brand_clean", "store_clean", "category_clean", "product",
-                "transaction_type", "deal_type", "order_type", "year_month",
-                # Raw string columns still needed by reports
-                "sold_by", "store", "brand", "category", "deals_used",
-                # High-cardinality but still fewer unique than rows → big savings
-                "customer_id", "customer_name", "receipt_id",
-            ]
+            cat_cols = _CATEGORY_COLUMNS
             for col in cat_cols:
                 if col in self.df.columns:
                     self.df[col] = self.df[col].astype("category")
@@ -63,21 +266,23 @@ class DataStore:
             if EXCLUDED_STORES and "store_clean" in self.df.columns:
                 before = len(self.df)
                 self.df = self.df[~self.df["store_clean"].isin(EXCLUDED_STORES)]
-                self.df["store_clean"] = self.df["store_clean"].cat.remove_unused_categories()
                 dropped = before - len(self.df)
                 if dropped:
+                    # Shrink every category set, not just store_clean, so the
+                    # excluded stores' labels (raw store name, their receipts
+                    # and customers) leave the dictionaries too
+                    for col in cat_cols:
+                        if col in self.df.columns:
+                            self.df[col] = self.df[col].cat.remove_unused_categories()
                     print(f"  Excluded {dropped:,} rows from {EXCLUDED_STORES}")
 
-            # Convert sale_date from Python date objects (~56 bytes each) to
-            # datetime64 (8 bytes each) — saves ~230 MB at 4.9M rows
-            if "sale_date" in self.df.columns:
-                self.df["sale_date"] = pd.to_datetime(self.df["sale_date"])
-
             gc.collect()
             regular_count = int((self.df["transaction_type"] == "REGULAR").sum())
             mem_mb = self.df.memory_usage(deep=True).sum() / 1024 / 1024
             print(f"  {regular_count:,} regular transactions (of {len(self.df):,} total)")
             print(f"  DataFrame memory: {mem_mb:.0f} MB")
+            if fingerprint:
+                _write_snapshot(self.df, fingerprint)
 
         # BT performance — use most recent file
         bt_files = discover_bt_csvs(inbox)
@@ -91,6 +296,8 @@ class DataStore:
             self.cust_attr_df = load_customer_attributes(cust_files[0])
             print(f"  Customer attributes: {cust_files[0].name} ({len(self.cust_attr_df):,} rows)")
 
+        # load() mutates columns in place; drop anything derived mid-load
+        self.invalidate()
         self._loaded = True
         return self
 
@@ -102,42 +309,94 @@ class DataStore:
     # Filtering
     # ------------------------------------------------------------------
 
-    def _apply_period(self, df: pd.DataFrame, period: PeriodFilter) -> pd.DataFrame:
-        """Filter a DataFrame by period date range + optional store.
+    def _period_mask(self, df: pd.DataFrame, period: PeriodFilter) -> Optional[np.ndarray]:
+        """Boolean row mask for period date range + optional store, or None for no filter.
 
         Uses fast integer year/month columns for common period types
         instead of slow date comparisons on millions of rows.
         """
         from app.data.schemas import PeriodType
 
+        mask = None
         if period.period_type == PeriodType.ALL:
             pass  # no date filter
         elif period.period_type == PeriodType.MONTH and period.year and period.month:
-            df = df[(df["year"] == period.year) & (df["month"] == period.month)]
+            mask = (df["year"] == period.year) & (df["month"] == period.month)
         elif period.period_type == PeriodType.QUARTER and period.year and period.quarter:
             m_start = (period.quarter - 1) * 3 + 1
             months = [m_start, m_start + 1, m_start + 2]
-            df = df[(df["year"] == period.year) & (df["month"].isin(months))]
+            mask = (df["year"] == period.year) & (df["month"].isin(months))
         elif period.period_type == PeriodType.RANGE and period.start_year and period.start_month and period.end_year and period.end_month:
             df_ym = df["year"].astype("int32") * 100 + df["month"].astype("int32")
             start_ym = period.start_year * 100 + period.start_month
             end_ym = period.end_year * 100 + period.end_month
-            df = df[(df_ym >= start_ym) & (df_ym <= end_ym)]
+            mask = (df_ym >= start_ym) & (df_ym <= end_ym)
         elif period.period_type == PeriodType.YEAR and period.year:
-            df = df[df["year"] == period.year]
+            mask = df["year"] == period.year
         else:
             # Custom or fallback — use date comparison
             start, end = period.resolve()
             if start is not None and end is not None:
-                df = df[(df["sale_date"] >= start) & (df["sale_date"] <= end)]
+                mask = (df["sale_date"] >= start) & (df["sale_date"] <= end)
             elif start is not None:
-                df = df[df["sale_date"] >= start]
+                mask = df["sale_date"] >= start
             elif end is not None:
-                df = df[df["sale_date"] <= end]
+                mask = df["sale_date"] <= end
 
         if period.store and "store_clean" in df.columns:
-            df = df[df["store_clean"] == period.store]
-        return df
+            store_mask = df["store_clean"] == period.store
+            mask = store_mask if mask is None else mask & store_mask
+        return None if mask is None else mask.to_numpy(dtype=bool)
+
+    def _apply_period(self, df: pd.DataFrame, period: PeriodFilter) -> pd.DataFrame:
+        """Filter a DataFrame by period date range + optional store."""
+        mask = self._period_mask(df, period)
+        return df if mask is None else df[mask]
+
+    def period_index(self, period: PeriodFilter) -> Optional[np.ndarray]:
+        """Row positions of get_regular() that fall in period (None = every row).
+
+        Memoized for the last few periods, so the reports in one run share a
+        single mask computation per period.
+        """
+        return self._memoized_by_period(
+            "period_index", period, lambda: self._period_rows(period), _PERIOD_INDEX_CACHE
+        )
+
+    def _period_rows(self, period: PeriodFilter) -> Optional[np.ndarray]:
+        regular = self.get_regular()
+        bounds = _month_bounds(period)
+        if bounds is not None:
+            # Month-aligned periods: gather the months' row lists instead of
+            # scanning year/month on every row
+            months, rows = self._memoized("month_index", self._month_index)
+            lo, hi = np.searchsorted(months, bounds[0], side="left"), np.searchsorted(months, bounds[1], side="right")
+            idx = np.sort(np.concatenate(rows[lo:hi])) if hi > lo else _NO_ROWS
+        elif period.resolve() == (None, None):
+            idx = None  # no date filter
+        else:
+            mask = self._period_mask(regular, period)
+            return None if mask is None else np.flatnonzero(mask)
+
+        if period.store and "store_clean" in regular.columns:
+            store_rows = self._memoized("store_index", self._store_index).get(period.store, _NO_ROWS)
+            idx = store_rows if idx is None else np.intersect1d(idx, store_rows, assume_unique=True)
+        return idx
+
+    def _month_index(self) -> tuple[np.ndarray, list[np.ndarray]]:
+        """(sorted YYYYMM keys, ascending regular-row positions for each)."""
+        regular = self.get_regular()
+        ym = regular["year"].to_numpy(dtype=np.int32) * 100 + regular["month"].to_numpy(dtype=np.int32)
+        order = np.argsort(ym, kind="stable")
+        months, starts = np.unique(ym[order], return_index=True)
+        return months, np.split(order, starts[1:])
+
+    def _store_index(self) -> dict:
+        """Store name -> ascending row positions within the regular frame."""
+        regular = self.get_regular()
+        if regular.empty:
+            return {}
+        return regular.groupby("store_clean", observed=True, sort=False).indices
 
     def get_sales(self, period: PeriodFilter | None = None) -> pd.DataFrame:
         """All sales (including non-regular) for a period.
@@ -155,15 +414,36 @@ class DataStore:
         Returns a filtered view (not a copy) for performance.
         Callers that need to mutate should call .copy() themselves.
         """
-        df = self.df[self.df["transaction_type"] == "REGULAR"] if not self.df.empty else self.df
+        df = self._memoized("regular", self._regular_rows)
         if period:
-            df = self._apply_period(df, period)
+            idx = self.period_index(period)
+            if idx is not None:
+                df = df.take(idx)
         return df
 
+    def _regular_rows(self) -> pd.DataFrame:
+        return self.df[self.df["transaction_type"] == "REGULAR"] if not self.df.empty else self.df
+
+    def _brand_index(self) -> dict:
+        """Upper-cased brand -> row positions within the regular frame."""
+        regular = self.get_regular()
+        if regular.empty:
+            return {}
+        # Upper-cased per distinct brand; rows only carry codes
+        upper = _clean_categorical(regular["brand_clean"], lambda s: s.str.upper())
+        return regular.groupby(upper, observed=True, sort=False).indices
+
     def get_brand(self, brand: str, period: PeriodFilter | None = None) -> pd.DataFrame:
-        """Regular sales for a specific brand."""
-        df = self.get_regular(period)
-        return df[df["brand_clean"].str.upper() == brand.upper()]
+        """Regular sales for a specific brand.
+
+        Slices the brand's rows from a per-load index, then applies the period
+        to that slice only — O(brand rows) rather than a full-frame scan.
+        """
+        rows = self._memoized("brand_index", self._brand_index).get(brand.upper(), [])
+        df = self.get_regular().iloc[rows]
+        if period:
+            df = self._apply_period(df, period)
+        return df
 
     # ------------------------------------------------------------------
     # Metadata queries
@@ -173,13 +453,19 @@ class DataStore:
         """Unique store names (cleaned). Excluded stores removed at load time."""
         if self.df.empty:
             return []
-        return sorted(self.df["store_clean"].dropna().unique().tolist())
+        return list(self._memoized("stores", lambda: self._sorted_unique("store_clean")))
+
+    def _sorted_unique(self, col: str) -> list[str]:
+        return sorted(self.df[col].dropna().unique().tolist())
 
     def brands(self) -> list[str]:
         """Unique brand names sorted by revenue desc."""
         if self.df.empty:
             return []
-        regular = self.df[self.df["transaction_type"] == "REGULAR"]
+        return list(self._memoized("brands", self._brands_by_revenue))
+
+    def _brands_by_revenue(self) -> list[str]:
+        regular = self.get_regular()
         rev = regular.groupby("brand_clean", observed=True)["actual_revenue"].sum().sort_values(ascending=False)
         return rev.index.tolist()
 
@@ -187,13 +473,19 @@ class DataStore:
         """Unique category names sorted alphabetically."""
         if self.df.empty:
             return []
-        return sorted(self.df["category_clean"].dropna().unique().tolist())
+        return list(self._memoized("categories", lambda: self._sorted_unique("category_clean")))
 
     def date_range(self, period: PeriodFilter | None = None) -> str:
         """Human-readable date range string.
 
-        Uses pre-cached regular data for faster filtering.
+        Memoized for the last few periods — the answer can't change until
+        the next load.
         """
+        return self._memoized_by_period(
+            "date_range", period, lambda: self._date_range(period), _PERIOD_RESULT_CACHE
+        )
+
+    def _date_range(self, period: PeriodFilter | None) -> str:
         df = self.get_regular(period)
         if df.empty:
             return "N/A"
@@ -206,10 +498,12 @@ class DataStore:
         """Return list of {year, month, label} dicts for months with data."""
         if self.df.empty:
             return []
+        return [dict(p) for p in self._memoized("periods_available", self._periods_available)]
+
+    def _periods_available(self) -> list[dict]:
         ym = self.df[["year", "month"]].drop_duplicates().sort_values(["year", "month"])
         result = []
-        for _, row in ym.iterrows():
-            y, m = int(row["year"]), int(row["month"])
+        for y, m in zip(ym["year"].tolist(), ym["month"].tolist()):
             label = f"{dt.date(y, m, 1):%B %Y}"
             result.append({"year": y, "month": m, "label": label})
         return result
@@ -220,21 +514,28 @@ class DataStore:
     def regular_count(self) -> int:
         if self.df.empty:
             return 0
-        return int((self.df["transaction_type"] == "REGULAR").sum())
+        return len(self.get_regular())
 
     # ------------------------------------------------------------------
     # Category & brand lookups (for brand reports)
     # ------------------------------------------------------------------
 
     def category_margin_lookup(self, period: PeriodFilter | None = None) -> dict[str, float]:
-        """Average margin by category for regular sales."""
+        """Average margin by category for regular sales.
+
+        Memoized per period, like date_range; callers get their own dict.
+        """
+        return dict(self._memoized_by_period(
+            "category_margin", period, lambda: self._category_margins(period), _PERIOD_RESULT_CACHE
+        ))
+
+    def _category_margins(self, period: PeriodFilter | None) -> dict[str, float]:
         regular = self.get_regular(period)
-        cat = regular.groupby("category_clean", observed=True).agg(
-            revenue=("actual_revenue", "sum"),
-            cost=("cost", "sum"),
-        ).reset_index()
-        cat["margin"] = ((cat["revenue"] - cat["cost"]) / cat["revenue"].replace(0, float("nan")) * 100).round(1)
-        return dict(zip(cat["category_clean"], cat["margin"]))
+        sums = regular.groupby("category_clean", observed=True)[["actual_revenue", "cost"]].sum()
+        revenue = sums["actual_revenue"].to_numpy()
+        denom = np.where(revenue == 0, np.nan, revenue).astype(revenue.dtype, copy=False)
+        margin = np.round((revenue - sums["cost"].to_numpy()) / denom * 100, 1)
+        return dict(zip(sums.index.tolist(), margin.tolist()))
 
     def brand_category_rankings(self, period: PeriodFilter | None = None) -> pd.DataFrame:
         """Revenue rankings per brand within each category."""
@@ -3,6 +3,9 @@ Reusable Excel cell/row formatting helpers.
 """
 from __future__ import annotations
 
+from copy import copy
+from weakref import WeakKeyDictionary
+
 import pandas as pd
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
@@ -18,18 +21,44 @@ from app.excel.styles import (
 )
 
 
+# ---------------------------------------------------------------------------
+# Style cache
+# ---------------------------------------------------------------------------
+
+# Workbook -> {(style key, starting style): resolved StyleArray}.
+# Each font/fill/border assignment hashes the style object into the
+# workbook's style tables; table cells repeat a handful of combinations, so
+# resolve each once and copy the index array onto later cells.
+_STYLE_CACHE: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _apply_style(cell, key, build) -> None:
+    """Style cell with build(cell), or copy the result of an identical earlier call."""
+    styles = _STYLE_CACHE.setdefault(cell.parent.parent, {})
+    full_key = (key, tuple(cell._style) if cell._style else None)
+    cached = styles.get(full_key)
+    if cached is None:
+        build(cell)
+        styles[full_key] = copy(cell._style)
+    else:
+        cell._style = copy(cached)
+
+
 # ---------------------------------------------------------------------------
 # Header row
 # ---------------------------------------------------------------------------
 
+def _style_header(cell) -> None:
+    cell.font = HEADER_FONT
+    cell.fill = HEADER_FILL
+    cell.alignment = CENTER
+    cell.border = HEADER_BORDER
+
+
 def format_header_row(ws: Worksheet, row_num: int, num_cols: int) -> None:
     """Apply header styling to an entire row."""
     for col in range(1, num_cols + 1):
-        cell = ws.cell(row=row_num, column=col)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.alignment = CENTER
-        cell.border = HEADER_BORDER
+        _apply_style(ws.cell(row=row_num, column=col), "header", _style_header)
 
 
 # ---------------------------------------------------------------------------
@@ -48,25 +77,34 @@ def format_data_cell(
     """Write and format a single data cell."""
     cell = ws.cell(row=row_num, column=col_num)
     cell.value = value
-    cell.font = TOTAL_FONT if is_total else DATA_FONT
-    cell.border = TOTAL_BORDER if is_total else THIN_BORDER
-    cell.alignment = RIGHT if col_type in ("currency", "number", "percent", "decimal") else LEFT
-
-    if col_type == "currency":
-        cell.number_format = '"$"#,##0.00'
-    elif col_type == "percent":
-        cell.number_format = '0.0"%"'
-    elif col_type == "number":
-        cell.number_format = "#,##0"
-    elif col_type == "decimal":
-        cell.number_format = "0.0"
 
     if highlight and highlight in HIGHLIGHT_FILLS:
-        cell.fill = HIGHLIGHT_FILLS[highlight]
+        fill, fill_key = HIGHLIGHT_FILLS[highlight], ("highlight", highlight)
     elif is_total:
-        cell.fill = TOTAL_FILL
+        fill, fill_key = TOTAL_FILL, "total"
     elif row_num % 2 == 0:
-        cell.fill = ALTERNATE_FILL
+        fill, fill_key = ALTERNATE_FILL, "alternate"
+    else:
+        fill, fill_key = None, None
+
+    def build(cell):
+        cell.font = TOTAL_FONT if is_total else DATA_FONT
+        cell.border = TOTAL_BORDER if is_total else THIN_BORDER
+        cell.alignment = RIGHT if col_type in ("currency", "number", "percent", "decimal") else LEFT
+
+        if col_type == "currency":
+            cell.number_format = '"$"#,##0.00'
+        elif col_type == "percent":
+            cell.number_format = '0.0"%"'
+        elif col_type == "number":
+            cell.number_format = "#,##0"
+        elif col_type == "decimal":
+            cell.number_format = "0.0"
+
+        if fill is not None:
+            cell.fill = fill
+
+    _apply_style(cell, ("data", col_type, is_total, fill_key), build)
 
 
 # ---------------------------------------------------------------------------
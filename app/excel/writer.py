@@ -158,11 +158,11 @@ class ExcelWriter:
 
         row = start_row + 1
         for idx, row_data in enumerate(rows):
+            hl = highlight_fn(idx, row_data) if highlight_fn else None
             for col_num, (key, col_type, _) in enumerate(columns, 1):
                 val = row_data.get(key, 0)
                 if pd.isna(val):
                     val = 0
-                hl = highlight_fn(idx, row_data) if highlight_fn else None
                 format_data_cell(ws, row, col_num, val, col_type, highlight=hl)
             row += 1
 
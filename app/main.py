@@ -14,6 +14,7 @@ from fastapi.staticfiles import StaticFiles
 
 from app.data.store import DataStore
 from app.api.dependencies import set_store
+from app.api.middleware import GzipRequestMiddleware
 from app.api.router_meta import router as meta_router
 from app.api.router_brands import router as brands_router
 from app.api.router_master import router as master_router
@@ -67,6 +68,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Uploads may arrive with Content-Encoding: gzip — inflated while streaming
+    app.add_middleware(GzipRequestMiddleware, path_prefix="/api/upload")
 
     app.include_router(meta_router)
     app.include_router(brands_router)
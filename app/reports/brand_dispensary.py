@@ -29,9 +29,14 @@ def generate_json(
     brand_name: str,
     period: PeriodFilter | None = None,
     comparison_period: PeriodFilter | None = None,
+    brand_df: pd.DataFrame | None = None,
 ) -> dict:
-    """Produce the full brand report as a JSON-serialisable dict."""
-    brand_df = store.get_brand(brand_name, period)
+    """Produce the full brand report as a JSON-serialisable dict.
+
+    Pass brand_df (store.get_brand for the same period) to skip re-filtering.
+    """
+    if brand_df is None:
+        brand_df = store.get_brand(brand_name, period)
     regular_df = store.get_regular(period)
     date_range = store.date_range(period)
 
@@ -203,9 +208,10 @@ def generate_excel(
     output_path: str | Path,
     period: PeriodFilter | None = None,
     comparison_period: PeriodFilter | None = None,
+    brand_df: pd.DataFrame | None = None,
 ) -> Path:
     """Generate the full Excel brand report."""
-    data = generate_json(store, brand_name, period, comparison_period)
+    data = generate_json(store, brand_name, period, comparison_period, brand_df=brand_df)
     if "error" in data:
         raise ValueError(data["error"])
 
@@ -31,9 +31,11 @@ def generate_json(
     store: DataStore,
     brand_name: str,
     period: PeriodFilter | None = None,
+    brand_df: pd.DataFrame | None = None,
 ) -> dict:
-    """Full brand-facing report as JSON."""
-    brand_df = store.get_brand(brand_name, period)
+    """Full brand-facing report as JSON. brand_df skips the get_brand filter when supplied."""
+    if brand_df is None:
+        brand_df = store.get_brand(brand_name, period)
     regular_df = store.get_regular(period)
     date_range = store.date_range(period)
 
@@ -293,9 +295,10 @@ def generate_excel(
     brand_name: str,
     output_path: str | Path,
     period: PeriodFilter | None = None,
+    brand_df: pd.DataFrame | None = None,
 ) -> Path:
     """Generate the brand-facing Excel report."""
-    data = generate_json(store, brand_name, period)
+    data = generate_json(store, brand_name, period, brand_df=brand_df)
     if "error" in data:
         raise ValueError(data["error"])
 
@@ -0,0 +1,74 @@
+"""Synthetic Flowhub exports for the data-path tests."""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from app.data import loader, store
+
+
+def sales_row(
+    receipt="R1", when="01/15/2025 10:00:00 AM", store_name="Thrive Cannabis Main - RD1",
+    brand="Wyld", category="Gummies", product=None, quantity=1, revenue=20.0,
+    cost=8.0, deals="", inline="", order_type="Regular",
+) -> dict:
+    """One raw sales-CSV row (Flowhub headers), currency written as "$1,234.50"."""
+    money = "${:,.2f}".format
+    return {
+        "Receipt ID": receipt, "Order Type": order_type, "Sold By": "Ann",
+        "Completed At": when, "Customer ID": "C1", "Customer Name": "Cust 1",
+        "Store": store_name, "Product": product or f"{brand} {category} Item",
+        "Variant Type": category, "Brand": brand, "Quantity Sold": quantity,
+        "Pre-Discount, Pre-Tax Total": money(revenue), "Discounts": money(0),
+        "Taxes": money(revenue * 0.1), "Post-Discount, Pre-Tax Total": money(revenue),
+        "Total Collected (Post-Discount, Post-Tax, Post-Fees)": money(revenue * 1.1),
+        "Receipt Total Collected": money(revenue * 1.1), "Net Profit": money(revenue - cost),
+        "Cost": money(cost), "Cost Per Item": money(cost / quantity),
+        "Deals Used": deals, "Inline/Cart Discounts Used": inline,
+    }
+
+
+def write_sales_csv(path: Path, rows: list[dict]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def margin_report(inbox: Path, start: str, end: str, rows: list[dict]) -> Path:
+    """Write rows as "John's Margin Report <start> <end>.csv" under inbox/<year>/."""
+    return write_sales_csv(inbox / start[:4] / f"John's Margin Report {start} {end}.csv", rows)
+
+
+class InboxTestCase:
+    """Mixin: a temp data folder whose caches never touch the real BASE_FOLDER.
+
+    Caching is off unless a test turns it on with THRIVE_CACHE=1.
+    """
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.inbox = self.root / "inbox"
+        self.inbox.mkdir()
+        for patcher in (
+            mock.patch.dict(os.environ, {"THRIVE_CACHE": "0"}),
+            mock.patch.object(store, "_SNAPSHOT_DIR", self.root / ".cache"),
+            mock.patch.object(loader, "_CHUNK_CACHE_DIR", self.root / ".cache" / "csv"),
+            # One process: no worker pools under test
+            mock.patch.object(os, "cpu_count", return_value=1),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def load(self, data_store=None) -> "store.DataStore":
+        """DataStore().load() on the temp inbox with its progress output swallowed."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return (data_store or store.DataStore()).load(self.inbox)
@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app import cli
+from app.data import loader, store
+from tests.inbox import InboxTestCase, margin_report, sales_row
+
+# Thread names alive at each os.fork while a test is recording
+_FORKS: list | None = None
+
+
+def _record_fork():
+    if _FORKS is not None:
+        _FORKS.append(sorted(t.name for t in threading.enumerate()))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_record_fork)
+
+
+class MainParserTest(unittest.TestCase):
+    def _main(self, *argv):
+        err = io.StringIO()
+        with mock.patch("sys.argv", ["cli.py", *argv]), contextlib.redirect_stderr(err), \
+                contextlib.redirect_stdout(io.StringIO()) as out, self.assertRaises(SystemExit) as cm:
+            cli.main()
+        return cm.exception.code, out.getvalue() + err.getvalue()
+
+    def test_invalid_choice_lists_every_subcommand(self):
+        # A later token naming a real subcommand must not hide the typo
+        for argv in (["brnd"], ["brnd", "export"], ["--bogus", "brand"]):
+            with self.subTest(argv):
+                code, msg = self._main(*argv)
+                self.assertEqual(code, 2)
+                self.assertIn("usage: cli.py [-h] {brand,master,serve,export} ...", msg)
+        _, msg = self._main("brnd", "export")
+        self.assertIn("argument command: invalid choice: 'brnd' (choose from 'brand', 'master', 'serve', 'export')", msg)
+
+    def test_help_lists_every_subcommand(self):
+        for argv in (["-h"], ["-h", "brand"]):
+            with self.subTest(argv):
+                code, msg = self._main(*argv)
+                self.assertEqual(code, 0)
+                for name, help_text in cli._SUBCOMMANDS.items():
+                    self.assertRegex(msg, rf"\n +{name} +{re.escape(help_text)}\n")
+
+    def test_subcommand_gets_its_own_arguments(self):
+        code, msg = self._main("export", "--list")
+        self.assertEqual(code, 2)
+        self.assertIn("unrecognized arguments: --list", msg)
+        with mock.patch.object(cli, "cmd_brand") as cmd_brand, mock.patch("sys.argv", ["cli.py", "brand", "--list", "--year", "2025"]):
+            cli.main()
+        args = cmd_brand.call_args.args[0]
+        self.assertEqual((args.command, args.list, args.year, args.brands), ("brand", True, 2025, []))
+
+
+class StaticIndexTest(unittest.TestCase):
+    # sha256 of app/static/index.html, and of the static index the original
+    # step-by-step str.replace implementation produced from it
+    TEMPLATE = "bcbc87bd80e58d5c5d8bde642aaaa28302b4b0540078d26657031b9407ede535"
+    GOLDEN = "ef62288a6b61e3fd9130bddcedea3e90488399ffe52053e4a460170c46f07b47"
+
+    def test_matches_original_patch_sequence(self):
+        template = (Path(cli.__file__).parent / "static" / "index.html").read_bytes()
+        if hashlib.sha256(template).hexdigest() != self.TEMPLATE:
+            self.skipTest("index.html changed since the golden output was recorded")
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            out = Path(tmp) / "index.html"
+            cli._generate_static_index(out)
+            self.assertEqual(hashlib.sha256(out.read_bytes()).hexdigest(), self.GOLDEN)
+
+
+class StorePoolTest(unittest.TestCase):
+    def test_single_cpu_has_no_pool(self):
+        with mock.patch.object(os, "cpu_count", return_value=1):
+            self.assertIsNone(cli._store_pool(object()))
+
+    def test_spawn_when_fork_is_unsafe(self):
+        with mock.patch.object(os, "cpu_count", return_value=2), \
+                mock.patch.object(loader, "_fork_context", return_value=None):
+            pool = cli._store_pool(object())
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+        # Spawned workers load their own store; nothing is pickled across
+        self.assertEqual(pool._initargs, ())
+        pool.shutdown()
+
+    def test_spawned_worker_loads_store(self):
+        loaded = store.DataStore()
+        with mock.patch.object(store.DataStore, "load", return_value=loaded) as load:
+            cli._init_store_worker()
+        load.assert_called_once_with()
+        self.assertIs(cli._WORKER_STORE, loaded)
+
+
+class WriteBytesTest(unittest.TestCase):
+    def test_creates_missing_folders_every_time(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a" / "b" / "c.json"
+            cli._write_bytes(path, b"{}")
+            shutil.rmtree(Path(tmp) / "a")
+            cli._write_bytes(path, b"[]")
+            self.assertEqual(path.read_bytes(), b"[]")
+            cli._write_bytes(path, b"1")
+            self.assertEqual(path.read_bytes(), b"1")
+
+
+class ExportTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            sales_row(receipt=f"R{m}-{i}", when=f"0{m}/{i + 1:02d}/2025 10:00:00 AM", brand=brand, revenue=10.0 + i)
+            for m in (1, 2) for i, brand in enumerate(["HAUS", "Wyld"] * 4)
+        ]
+        margin_report(self.inbox, "2025-01-01", "2025-02-28", rows)
+        patcher = mock.patch.object(store.DataStore.load, "__defaults__", (self.inbox,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _export(self, name, cpus):
+        out = self.root / name
+        with mock.patch.object(os, "cpu_count", return_value=cpus), contextlib.redirect_stdout(io.StringIO()):
+            cli.cmd_export(argparse.Namespace(output=str(out)))
+        return {str(p.relative_to(out)): p.read_bytes() for p in out.rglob("*.json")}
+
+    def test_export_writes_every_file_after_writer_restart(self):
+        files = self._export("serial", 1)
+        # Brand files come back from the pool phase, after the writer restart
+        self.assertIn("data/brands/haus/facing.json", files)
+        self.assertIn("data/brands/wyld/facing-2025.json", files)
+        self.assertIn("data/master/margin.json", files)
+
+    def test_reexport_recreates_removed_folders(self):
+        first = self._export("out", 1)
+        # Removed between two exports in one process
+        shutil.rmtree(self.root / "out" / "data" / "brands")
+        self.assertEqual(self._export("out", 1), first)
+
+    @unittest.skipUnless(loader._fork_context() is not None, "fork is not available here")
+    def test_pooled_export_forks_single_threaded_and_matches_serial(self):
+        global _FORKS
+        serial = self._export("serial", 1)
+        _FORKS = []
+        try:
+            pooled = self._export("pooled", 2)
+            forks = _FORKS
+        finally:
+            _FORKS = None
+        self.assertTrue(forks)
+        self.assertTrue(all(names == ["MainThread"] for names in forks), forks)
+        self.assertEqual(pooled, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,417 @@
+import contextlib
+import gc
+import io
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from app.data import loader
+from tests.inbox import InboxTestCase, margin_report, sales_row, write_sales_csv
+
+
+def _reference_discover(inbox, keywords, exclude_keywords=()):
+    """rglob + substring discovery sorted on the end-date string, as first written."""
+    matches = [
+        p for p in inbox.rglob("*.csv")
+        if not any(ex in p.name.lower() for ex in exclude_keywords)
+        and any(kw in p.name.lower() for kw in keywords)
+    ]
+    return sorted(matches, key=lambda p: loader._parse_file_dates(p)[1] or "0000-00-00", reverse=True)
+
+
+class DiscoverCsvsTest(InboxTestCase, unittest.TestCase):
+    NAMES = [
+        "2025/John's Margin Report 2025-01-01 2025-01-31.csv",
+        "2025/MARGIN REPORT 2025-03-01 2025-03-31.csv",
+        "2025/sub/line_item export 2025-02-01 2025-02-28.csv",
+        "2024/Sales Performance 2024-12-01 2024-12-31.csv",
+        "2024/margin no dates.csv",
+        "2024/margin same end 2024-12-15 2024-12-31.csv",
+        "BT Sales 2025-01-01 2025-01-31.csv",
+        "budtender margin 2025-04-01 2025-04-30.csv",
+        "Customer attributes 2025-05-01 2025-05-31.csv",
+        "customer margin 2025-06-01 2025-06-30.csv",
+        "margin not csv.txt",
+        "margin upper ext 2025-07-01 2025-07-31.CSV",
+        "inventory 2025-01-01 2025-01-31.csv",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        for name in self.NAMES:
+            (self.inbox / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.inbox / name).write_text("x\n")
+
+    def test_matches_rglob_discovery(self):
+        sales_ex = loader.BT_PERFORMANCE_KEYWORDS + loader.CUSTOMER_KEYWORDS
+        self.assertEqual(
+            loader.discover_csvs(self.inbox),
+            _reference_discover(self.inbox, loader.SALES_KEYWORDS, sales_ex),
+        )
+        self.assertEqual(
+            loader.discover_bt_csvs(self.inbox),
+            _reference_discover(self.inbox, loader.BT_PERFORMANCE_KEYWORDS),
+        )
+        self.assertEqual(
+            loader.discover_customer_csvs(self.inbox),
+            _reference_discover(self.inbox, loader.CUSTOMER_KEYWORDS),
+        )
+
+    def test_most_recent_end_date_first(self):
+        names = [p.name for p in loader.discover_csvs(self.inbox)]
+        self.assertEqual(names[:3], [
+            "MARGIN REPORT 2025-03-01 2025-03-31.csv",
+            "line_item export 2025-02-01 2025-02-28.csv",
+            "John's Margin Report 2025-01-01 2025-01-31.csv",
+        ])
+        # Undated files sort last
+        self.assertEqual(names[-1], "margin no dates.csv")
+
+    def test_listing_follows_inbox_changes(self):
+        # Directories settled long ago, so the cached listing is trusted
+        past = time.time() - 60
+        for d in [self.inbox, *(p for p in self.inbox.rglob("*") if p.is_dir())]:
+            os.utime(d, (past, past))
+        first = loader.discover_csvs(self.inbox)
+        added = self.inbox / "2025" / "sub" / "margin 2025-08-01 2025-08-31.csv"
+        added.write_text("x\n")
+        self.assertEqual(loader.discover_csvs(self.inbox), [added, *first])
+        first[0].unlink()
+        self.assertEqual(loader.discover_csvs(self.inbox), [added, *first[1:]])
+
+    def test_missing_inbox(self):
+        self.assertEqual(loader.discover_csvs(self.root / "nope"), [])
+
+
+class ChunkCacheTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.jan = margin_report(self.inbox, "2025-01-01", "2025-01-31", [sales_row(receipt="J1"), sales_row(receipt="J2")])
+        self.feb = margin_report(self.inbox, "2025-02-01", "2025-02-28", [
+            sales_row(receipt="F1", when="02/03/2025 10:00:00 AM"),
+        ])
+        patcher = mock.patch.dict(os.environ, {"THRIVE_CACHE": "1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _load(self):
+        with mock.patch.object(loader, "_parse_single_csv", wraps=loader._parse_single_csv) as parse, \
+                contextlib.redirect_stdout(io.StringIO()):
+            df = loader.load_all_csvs(self.inbox)
+        return df, sorted(Path(c.args[0]).name for c in parse.call_args_list)
+
+    def test_unchanged_files_are_not_reparsed(self):
+        first, parsed = self._load()
+        self.assertEqual(len(parsed), 2)
+        second, parsed = self._load()
+        self.assertEqual(parsed, [])
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_changed_file_is_reparsed_and_stale_entry_pruned(self):
+        self._load()
+        write_sales_csv(self.feb, [
+            sales_row(receipt="F1", when="02/03/2025 10:00:00 AM"),
+            sales_row(receipt="F2", when="02/04/2025 10:00:00 AM"),
+        ])
+        df, parsed = self._load()
+        self.assertEqual(parsed, [self.feb.name])
+        self.assertEqual(sorted(df["receipt_id"].astype(str)), ["F1", "F2", "J1", "J2"])
+        self.assertEqual(len(list(loader._CHUNK_CACHE_DIR.iterdir())), 2)
+
+    def test_disabled_cache_always_parses(self):
+        with mock.patch.dict(os.environ, {"THRIVE_CACHE": "0"}):
+            self._load()
+            _, parsed = self._load()
+        self.assertEqual(len(parsed), 2)
+
+
+class LoadAllCsvsTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", [
+            # Superseded below; its brand label must not outlive it
+            sales_row(receipt="R1", brand="Wyld Old", product="Wyld Gummies Item", revenue=20.0),
+            sales_row(receipt="R2", brand="Cookies", category="Flower"),
+        ])
+        # Later export restates R1; its row wins
+        margin_report(self.inbox, "2025-01-15", "2025-02-28", [
+            sales_row(receipt="R1", brand="Wyld", revenue=25.0),
+            sales_row(receipt="R3", when="02/02/2025 10:00:00 AM", brand="Stiiizy",
+                      store_name="Thrive Cannabis East - RD2", deals="20% off"),
+        ])
+
+    def _load(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            return loader.load_all_csvs(self.inbox), out.getvalue()
+
+    def test_categoricals_span_every_file(self):
+        df, _ = self._load()
+        self.assertEqual(df["receipt_id"].astype(str).tolist(), ["R1", "R3", "R2"])
+        self.assertEqual(df.loc[0, "actual_revenue"], 25.0)
+        for col in ("brand_clean", "store_clean", "category_clean", "product"):
+            with self.subTest(col):
+                values = df[col]
+                self.assertIsInstance(values.dtype, pd.CategoricalDtype)
+                # Sorted union of what survived dedup, as astype("category") builds
+                self.assertEqual(list(values.cat.categories), sorted(values.astype(str).unique()))
+        self.assertEqual(df["deal_type"].astype(str).tolist(), ["NO DEAL", "PERCENT OFF", "NO DEAL"])
+        self.assertEqual(df["year_month"].astype(str).tolist(), ["2025-01", "2025-02", "2025-01"])
+        for col in ("product_clean", "deals_upper", "inline_discounts", "taxes"):
+            self.assertNotIn(col, df.columns)
+
+    def test_concat_recodes_onto_category_union(self):
+        chunks = [
+            pd.DataFrame({"b": pd.Categorical(["y", "x"]), "n": pd.Series([np.nan, np.nan]).astype("category")}),
+            pd.DataFrame({"b": pd.Categorical(["z", "x"]), "n": [np.nan, np.nan]}),
+        ]
+        df = loader._concat_chunks(chunks)
+        self.assertEqual(list(df["b"].cat.categories), ["x", "y", "z"])
+        self.assertEqual(df["b"].tolist(), ["y", "x", "z", "x"])
+        # Blank in one file, categorical in another: plain concat
+        self.assertNotIsInstance(df["n"].dtype, pd.CategoricalDtype)
+
+    def test_bad_file_is_skipped_and_gc_restored(self):
+        (self.inbox / "2025" / "margin broken 2025-03-01 2025-03-31.csv").write_text("not,a\nsales,export\n")
+        self.assertTrue(gc.isenabled())
+        df, out = self._load()
+        self.assertIn("skipping margin broken 2025-03-01 2025-03-31.csv", out)
+        self.assertEqual(len(df), 3)
+        self.assertTrue(gc.isenabled())
+
+
+class ForkContextTest(unittest.TestCase):
+    def test_forks_only_on_linux(self):
+        with mock.patch.object(sys, "platform", "darwin"):
+            self.assertIsNone(loader._fork_context())
+
+    def test_no_fork_beside_other_threads(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            self.assertIsNone(loader._fork_context())
+        finally:
+            stop.set()
+            thread.join()
+
+
+class IterLoadedTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.files = [
+            margin_report(self.inbox, f"2025-0{m}-01", f"2025-0{m}-28", [sales_row(receipt=f"R{m}", when=f"0{m}/02/2025 10:00:00 AM")])
+            for m in (1, 2, 3)
+        ]
+
+    def _receipts(self):
+        return [chunk["receipt_id"].tolist() for _, chunk, _ in loader._iter_loaded(self.files)]
+
+    def test_serial_when_fork_is_unsafe(self):
+        with mock.patch.object(os, "cpu_count", return_value=4), \
+                mock.patch.object(loader, "_fork_context", return_value=None), \
+                mock.patch("concurrent.futures.ProcessPoolExecutor") as pool:
+            self.assertEqual(self._receipts(), [["R1"], ["R2"], ["R3"]])
+        pool.assert_not_called()
+
+    @unittest.skipUnless(loader._fork_context() is not None, "fork is not available here")
+    def test_worker_pool_keeps_file_order(self):
+        with mock.patch.object(os, "cpu_count", return_value=2):
+            self.assertEqual(self._receipts(), [["R1"], ["R2"], ["R3"]])
+
+
+def _key_chunks(seed, n_chunks=4, rows=200):
+    """Overlapping key batches: repeats within and across chunks, NaN keys, mixed receipt types."""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for _ in range(n_chunks):
+        receipt = rng.integers(0, 40, rows).astype(object)
+        receipt[rng.random(rows) < 0.1] = np.nan
+        product = rng.choice(np.array(["A", "B", "C", None], dtype=object), rows)
+        when = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 3, rows), unit="D")
+        when = pd.Series(when).where(rng.random(rows) > 0.05)
+        chunks.append(pd.DataFrame({"receipt_id": receipt, "product": product, "completed_at": when.to_numpy()}))
+    return chunks
+
+
+class SeenRowsTest(unittest.TestCase):
+    def _streamed(self, chunks):
+        seen = loader._SeenRows()
+        return pd.concat([ch[seen.add(ch)] for ch in chunks], ignore_index=True)
+
+    def _expected(self, chunks):
+        return pd.concat(chunks, ignore_index=True).drop_duplicates(keep="first").reset_index(drop=True)
+
+    def test_matches_drop_duplicates_keep_first(self):
+        for seed in range(5):
+            chunks = _key_chunks(seed)
+            pd.testing.assert_frame_equal(self._streamed(chunks), self._expected(chunks))
+
+    def test_fingerprint_collisions_are_confirmed_on_keys(self):
+        # Every row shares one fingerprint: only the exact key comparison
+        # can tell rows apart, across chunks as well as within one
+        chunks = _key_chunks(11)
+        with mock.patch.object(loader._SeenRows, "_fingerprint", staticmethod(lambda keys: np.zeros(len(keys), dtype=np.uint64))):
+            streamed = self._streamed(chunks)
+        pd.testing.assert_frame_equal(streamed, self._expected(chunks))
+
+    def test_nan_keys_dedup_like_pandas(self):
+        a = pd.DataFrame({"receipt_id": [np.nan, "R1"], "product": [None, "A"], "completed_at": [pd.NaT, pd.NaT]})
+        b = pd.DataFrame({"receipt_id": [np.nan, "R1", "R1"], "product": [None, "A", "B"], "completed_at": [pd.NaT] * 3})
+        seen = loader._SeenRows()
+        self.assertEqual(seen.add(a).tolist(), [True, True])
+        self.assertEqual(seen.add(b).tolist(), [False, False, True])
+
+    def test_int_and_float_receipt_ids_compare_equal(self):
+        when = pd.Timestamp("2025-01-01")
+        seen = loader._SeenRows()
+        seen.add(pd.DataFrame({"receipt_id": [1, 2], "product": ["A", "A"], "completed_at": [when, when]}))
+        later = pd.DataFrame({"receipt_id": [1.0, 3.0], "product": ["A", "A"], "completed_at": [when, when]})
+        self.assertEqual(seen.add(later).tolist(), [False, True])
+
+
+class DedupPrecedenceTest(InboxTestCase, unittest.TestCase):
+    def test_most_recent_export_wins(self):
+        row = dict(receipt="R1", when="01/10/2025 10:00:00 AM", product="Wyld Gummies Item")
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", [sales_row(cost=5.0, **row), sales_row(receipt="R2")])
+        # A later re-export covering the same sale with a revised cost
+        margin_report(self.inbox, "2025-01-01", "2025-03-31", [sales_row(cost=7.0, **row)])
+        df = self.load().df
+        self.assertEqual(sorted(df["receipt_id"].astype(str)), ["R1", "R2"])
+        self.assertEqual(float(df.loc[df["receipt_id"] == "R1", "cost"].iloc[0]), 7.0)
+
+
+def _cost_row(receipt, brand, category, product, quantity, year, cost):
+    return sales_row(
+        receipt=receipt, when=f"03/05/{year} 10:00:00 AM", brand=brand, category=category,
+        product=product, quantity=quantity, revenue=50.0, cost=cost,
+    )
+
+
+class InternalCostCorrectionTest(InboxTestCase, unittest.TestCase):
+    """Corrected (cost, cost_per_item, net_profit) as the row-by-row baseline produced them."""
+
+    EXPECTED = {
+        "pre": (8.00, 4.00, 42.00),          # pre_roll, per unit
+        "pack": (4.00, 4.00, 46.00),         # PRE ROLL PACK is a pre-roll too
+        "default": (6.62, 6.62, 43.38),      # lower-case brand, default price
+        "cart": (31.83, 10.61, 18.17),
+        "dispo": (12.44, 12.44, 37.56),
+        "eighth": (13.00, 13.00, 37.00),     # flower_eighth
+        "halfoz": (50.00, 25.00, 0.00),      # flower_half_oz by product name
+        "14g": (25.00, 25.00, 25.00),
+        "noprice": (3.00, 3.00, 47.00),      # FADE has no flower price: untouched
+        "pistola": (17.26, 8.63, 32.74),
+        "external": (8.00, 8.00, 42.00),     # not an internal brand
+        "pre24": (4.00, 4.00, 46.00),
+        "cart24": (10.61, 10.61, 39.39),
+    }
+
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-03-01", "2025-03-31", [
+            _cost_row("pre", "HAUS", "Pre-Roll", "HAUS Pre-Roll 1g", 2, 2025, 1.5),
+            _cost_row("pack", "Hustle & Grow", "Preroll Pack", "H&G Pack", 1, 2025, 20.0),
+            _cost_row("default", "haus", "Gummies", "HAUS Gummies", 1, 2025, 30.0),
+            _cost_row("cart", "FADE", "Vape", "FADE Cart 1g", 3, 2025, 9.0),
+            _cost_row("dispo", "Retreat", "Disposable", "Retreat Dispo", 1, 2025, 40.0),
+            _cost_row("eighth", "SRENE", "Flower", "SRENE Blue Dream 3.5g", 1, 2025, 2.0),
+            _cost_row("halfoz", "SRENE", "Flower", "SRENE Blue Dream Half Ounce", 2, 2025, 2.0),
+            _cost_row("14g", "SRENE", "Flower", "SRENE OG 14g", 1, 2025, 2.0),
+            _cost_row("noprice", "FADE", "Flower", "FADE Flower", 1, 2025, 3.0),
+            _cost_row("pistola", "Pistola", "Edible", "Pistola Bar", 2, 2025, 0.5),
+            _cost_row("external", "Wyld", "Gummies", "Wyld Gummies", 1, 2025, 8.0),
+        ])
+        margin_report(self.inbox, "2024-03-01", "2024-03-31", [
+            _cost_row("pre24", "Green & Gold", "Pre-Roll", "G&G Pre-Roll", 1, 2024, 0.01),
+            _cost_row("cart24", "FADE", "Cart", "FADE Cart", 1, 2024, 15.0),
+        ])
+
+    def _costs(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = loader.load_all_csvs(self.inbox)
+        df = df.set_index(df["receipt_id"].astype(str))
+        return {rid: tuple(round(float(v), 2) for v in row) for rid, row in df[["cost", "cost_per_item", "net_profit"]].iterrows()}
+
+    def test_every_cost_kind(self):
+        self.assertEqual(self._costs(), self.EXPECTED)
+
+    def test_conditional_year_only_fixes_sub_dollar_costs(self):
+        with mock.patch.dict(loader.COST_CORRECTION_YEARS, {2024: "conditional"}):
+            costs = self._costs()
+        self.assertEqual(costs["pre24"], (4.00, 4.00, 46.00))
+        self.assertEqual(costs["cart24"], (15.00, 15.00, 35.00))
+        self.assertEqual(costs["cart"], self.EXPECTED["cart"])
+
+
+class ClassificationTest(InboxTestCase, unittest.TestCase):
+    """transaction_type / deal_type per keyword, as the baseline classifiers labelled them."""
+
+    # (receipt, deals used, inline discounts, product, revenue, order type)
+    # -> (transaction_type, deal_type)
+    CASES = [
+        ("plain", "", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "NO DEAL"),
+        ("reward", "REWARD - 100 Points - Free preroll", "", "Wyld Gummies", 20.0, "Regular", "REWARD", "OTHER"),
+        ("points", "Loyalty point redemption", "", "Wyld Gummies", 20.0, "Regular", "REWARD", "OTHER"),
+        ("markout", "Markout", "", "Wyld Gummies", 20.0, "Regular", "MARKOUT", "OTHER"),
+        ("mark-out", "damaged mark-out", "", "Wyld Gummies", 20.0, "Regular", "MARKOUT", "OTHER"),
+        # TESTER > MARKOUT > REWARD > COMP
+        ("reward+markout", "Reward markout", "", "Wyld Gummies", 20.0, "Regular", "MARKOUT", "OTHER"),
+        ("tester-product", "REWARD", "", "Wyld TESTER", 20.0, "Regular", "TESTER", "OTHER"),
+        ("tester-deal", "Tester deal", "", "Wyld Gummies", 20.0, "Regular", "TESTER", "OTHER"),
+        ("tester+markout", "tester markout", "", "Wyld Gummies", 20.0, "Regular", "TESTER", "OTHER"),
+        ("reward-free", "Reward", "", "Wyld Gummies", 0.0, "Regular", "REWARD", "OTHER"),
+        ("comp", "", "", "Wyld Gummies", 0.0, "Regular", "COMP", "NO DEAL"),
+        ("comp-1.00", "", "", "Wyld Gummies", 1.00, "Regular", "COMP", "NO DEAL"),
+        ("regular-1.01", "", "", "Wyld Gummies", 1.01, "Regular", "REGULAR", "NO DEAL"),
+        ("exit-bag", "", "", "Thrive Exit Bag", 0.0, "Regular", "REGULAR", "NO DEAL"),
+        # BUNDLE > PERCENT OFF > CUSTOMER DISCOUNT > PRICE DEAL > OTHER
+        ("b1g1", "B1G1 carts", "", "Wyld Gummies", 20.0, "Delivery", "REGULAR", "BUNDLE"),
+        ("2for", "2 for $40", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "BUNDLE"),
+        ("3slash", "3/$50 edibles", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "BUNDLE"),
+        ("bogo+vip", "BOGO", "VIP", "Wyld Gummies", 20.0, "Regular", "REGULAR", "BUNDLE"),
+        ("percent", "20% off", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PERCENT OFF"),
+        ("percent-word", "Ten percent Tuesday", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PERCENT OFF"),
+        ("senior-percent", "Senior 10%", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PERCENT OFF"),
+        ("senior", "Senior discount", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "CUSTOMER DISCOUNT"),
+        ("employee", "employee", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "CUSTOMER DISCOUNT"),
+        ("inline-vip", "", "vip", "Wyld Gummies", 20.0, "Regular", "REGULAR", "CUSTOMER DISCOUNT"),
+        ("inline-percent", "", "10% cart", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PERCENT OFF"),
+        ("price", "Eighth for $25", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PRICE DEAL"),
+        ("price-nospace", "Any two FOR$30", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "PRICE DEAL"),
+        ("other", "Happy hour", "", "Wyld Gummies", 20.0, "Regular", "REGULAR", "OTHER"),
+        ("inline-other", "", "misc", "Wyld Gummies", 20.0, "Regular", "REGULAR", "OTHER"),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-03-01", "2025-03-31", [
+            sales_row(receipt=r, deals=d, inline=i, product=p, revenue=rev, cost=0.0, order_type=o)
+            for r, d, i, p, rev, o, *_ in self.CASES
+        ])
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = loader.load_all_csvs(self.inbox)
+        self.df = df.set_index(df["receipt_id"].astype(str))
+
+    def test_labels(self):
+        for receipt, *_, order_type, tx, deal in self.CASES:
+            with self.subTest(receipt):
+                row = self.df.loc[receipt]
+                self.assertEqual((row["transaction_type"], row["deal_type"]), (tx, deal))
+                self.assertEqual(row["order_type"], order_type)
+
+    def test_labels_are_sorted_observed_categoricals(self):
+        for col in ("transaction_type", "deal_type"):
+            values = self.df[col]
+            self.assertIsInstance(values.dtype, pd.CategoricalDtype)
+            self.assertEqual(list(values.cat.categories), sorted(values.astype(str).unique()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import gzip
+import unittest
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.testclient import TestClient
+
+from app.api.middleware import GzipRequestMiddleware
+
+# Varied rows, so the gzip form spans many 1000-byte messages
+BODY = b"receipt,total\n" + b"".join(b"R%d,$%d.%02d\n" % (i, i * 7919 % 500, i % 100) for i in range(5000))
+
+
+def _client(max_size=None) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/api/upload")
+    @app.post("/api/other")
+    async def echo(request: Request):
+        return Response(await request.body(), media_type="application/octet-stream")
+
+    app.add_middleware(GzipRequestMiddleware, **({} if max_size is None else {"max_size": max_size}))
+    return TestClient(app)
+
+
+def _stream(body: bytes, size: int = 1000, max_size=None) -> bytes:
+    """Send body as several http.request messages; return what the app read.
+
+    TestClient always delivers the body as a single message, so this drives
+    the middleware directly to cover bodies that arrive in pieces.
+    """
+    pieces = [body[i:i + size] for i in range(0, len(body), size)]
+    messages = [{"type": "http.request", "body": p, "more_body": True} for p in pieces]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    received = bytearray()
+
+    async def app(scope, receive, send):
+        assert not any(k in (b"content-encoding", b"content-length") for k, _ in scope["headers"])
+        while True:
+            message = await receive()
+            received.extend(message["body"])
+            if not message["more_body"]:
+                return
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "path": "/api/upload", "headers": [
+        (b"content-encoding", b"gzip"), (b"content-length", str(len(body)).encode()),
+    ]}
+    kw = {} if max_size is None else {"max_size": max_size}
+    asyncio.run(GzipRequestMiddleware(app, **kw)(scope, receive, send))
+    return bytes(received)
+
+
+class GzipRequestMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def post(self, content, path="/api/upload", encoding="gzip"):
+        headers = {"content-encoding": encoding} if encoding else {}
+        return self.client.post(path, content=content, headers=headers)
+
+    def test_valid_gzip_is_inflated(self):
+        for name, content in [
+            ("whole", gzip.compress(BODY)),
+            ("members", gzip.compress(BODY[:1000]) + gzip.compress(BODY[1000:])),
+            ("zero padding", gzip.compress(BODY) + b"\0" * 64),
+        ]:
+            with self.subTest(name):
+                r = self.post(content)
+                self.assertEqual(r.status_code, 200)
+                self.assertEqual(r.content, BODY)
+                self.assertEqual(r.headers["accept-encoding"], "gzip")
+
+    def test_plain_body_passes_through(self):
+        r = self.post(BODY, encoding=None)
+        self.assertEqual((r.status_code, r.content), (200, BODY))
+
+    def test_other_paths_are_untouched(self):
+        gz = gzip.compress(BODY)
+        r = self.post(gz, path="/api/other")
+        self.assertEqual((r.status_code, r.content), (200, gz))
+        self.assertNotIn("accept-encoding", r.headers)
+
+    def test_truncated_gzip_is_400(self):
+        gz = gzip.compress(BODY)
+        for name, content in [
+            ("half", gz[:len(gz) // 2]),
+            ("no trailer", gz[:-8]),
+        ]:
+            with self.subTest(name):
+                r = self.post(content)
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("Truncated gzip body", r.json()["detail"])
+
+    def test_corrupt_or_trailing_garbage_is_400(self):
+        gz = gzip.compress(BODY)
+        for name, content in [
+            ("trailing garbage", gz + b"garbage"),
+            ("corrupt", gz[:100] + b"\xff" * 50 + gz[150:]),
+            ("not gzip", b"not gzip at all"),
+        ]:
+            with self.subTest(name):
+                r = self.post(content)
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("Invalid gzip body", r.json()["detail"])
+
+    def test_over_max_size_is_413(self):
+        client = _client(max_size=len(BODY) - 1)
+        for name, content in [
+            ("whole", gzip.compress(BODY)),
+            ("members", gzip.compress(BODY[:1000]) + gzip.compress(BODY[1000:])),
+        ]:
+            with self.subTest(name):
+                r = client.post("/api/upload", content=content, headers={"content-encoding": "gzip"})
+                self.assertEqual(r.status_code, 413)
+
+    def test_exactly_max_size_is_accepted(self):
+        client = _client(max_size=len(BODY))
+        r = client.post("/api/upload", content=gzip.compress(BODY), headers={"content-encoding": "gzip"})
+        self.assertEqual((r.status_code, r.content), (200, BODY))
+
+
+class StreamedGzipTest(unittest.TestCase):
+    def test_inflated_across_messages(self):
+        for name, content in [
+            ("one member", gzip.compress(BODY)),
+            # Member boundary and padding land mid-message
+            ("members", gzip.compress(BODY[:1500]) + b"\0" * 3 + gzip.compress(BODY[1500:])),
+        ]:
+            with self.subTest(name):
+                self.assertEqual(_stream(content, size=97), BODY)
+
+    def test_truncated_stream_is_400(self):
+        gz = gzip.compress(BODY)
+        with self.assertRaises(HTTPException) as cm:
+            _stream(gz[:len(gz) // 2])
+        self.assertEqual(cm.exception.status_code, 400)
+
+    def test_trailing_garbage_in_later_message_is_400(self):
+        with self.assertRaises(HTTPException) as cm:
+            _stream(gzip.compress(BODY) + b"garbage" * 300)
+        self.assertEqual(cm.exception.status_code, 400)
+
+    def test_budget_spans_messages(self):
+        gz = gzip.compress(BODY)
+        self.assertEqual(_stream(gz, max_size=len(BODY)), BODY)
+        with self.assertRaises(HTTPException) as cm:
+            _stream(gz, max_size=len(BODY) - 1)
+        self.assertEqual(cm.exception.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.config import CATEGORY_NORMALIZATION
+from app.data.normalize import (
+    get_customer_segment,
+    get_customer_segments,
+    normalize_categories,
+    normalize_columns,
+    parse_number,
+)
+from tests.inbox import sales_row
+
+
+class ParseNumberTest(unittest.TestCase):
+    def test_object_text(self):
+        values = pd.Series(["$1,234.50", None, "$117.97"], dtype=object)
+        self.assertEqual(parse_number(values).tolist()[::2], [1234.5, 117.97])
+        self.assertTrue(np.isnan(parse_number(values).iloc[1]))
+
+    def test_string_dtype_text(self):
+        # pandas 3 (or future.infer_string) reads text columns as a string
+        # dtype rather than object — they still have to be stripped
+        for dtype in ("string", pd.StringDtype(na_value=np.nan)):
+            values = pd.Series(["$1,234.50", None, "$117.97"], dtype=dtype)
+            result = parse_number(values)
+            self.assertEqual(result.dtype, float)
+            self.assertEqual(result.tolist()[::2], [1234.5, 117.97])
+            self.assertTrue(np.isnan(result.iloc[1]))
+
+    def test_numeric_input_is_cast(self):
+        self.assertEqual(parse_number(pd.Series([1, 2])).tolist(), [1.0, 2.0])
+
+
+class NormalizeColumnsTest(unittest.TestCase):
+    def setUp(self):
+        rows = [
+            sales_row(receipt="A", when="12/31/1969 11:59:59 PM", store_name="Thrive Cannabis Main - RD12",
+                      brand=" Wyld ", category=" preroll ", deals="b1g1"),
+            sales_row(receipt="B", when="not a date"),
+            sales_row(receipt="C", when="03/05/2025 01:02:03 PM", store_name="Thrive East", brand="Wyld",
+                      category="Pre-Roll", product=" exit bag ", revenue=1234.5),
+        ]
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.df = normalize_columns(pd.DataFrame(rows))
+        self.out = out.getvalue()
+
+    def test_unparseable_dates_dropped(self):
+        self.assertEqual(self.df["receipt_id"].tolist(), ["A", "C"])
+        self.assertIn("1 rows dropped", self.out)
+
+    def test_cleaned_strings(self):
+        df = self.df
+        self.assertEqual(df["store_clean"].tolist(), ["Thrive Cannabis Main", "Thrive East"])
+        self.assertEqual(df["category_clean"].tolist(), ["PREROLL", "PRE-ROLL"])
+        self.assertEqual(df["product_clean"].tolist(), ["WYLD   PREROLL  ITEM", "EXIT BAG"])
+        self.assertEqual(df["deals_upper"].tolist(), ["B1G1", ""])
+        # " Wyld " and "Wyld" clean to one label
+        self.assertEqual(df["brand_clean"].tolist(), ["Wyld", "Wyld"])
+        self.assertEqual(list(df["brand_clean"].cat.categories), ["Wyld"])
+
+    def test_numbers_and_dates(self):
+        df = self.df
+        self.assertEqual(df["actual_revenue"].tolist(), [20.0, 1234.5])
+        self.assertEqual(df["has_discount"].tolist(), [False, False])
+        self.assertEqual(df["sale_date"].tolist(), [pd.Timestamp("1969-12-31"), pd.Timestamp("2025-03-05")])
+        # Month ordinals before 1970 are negative; year/month still come out right
+        self.assertEqual(df["year"].tolist(), [1969, 2025])
+        self.assertEqual(df["month"].tolist(), [12, 3])
+        self.assertEqual(df["year_month"].tolist(), [pd.Period("1969-12", "M"), pd.Period("2025-03", "M")])
+
+
+class NormalizeCategoriesTest(unittest.TestCase):
+    def test_aliases_map_and_others_keep_their_name(self):
+        raw = ["PREROLL", "VAPE", "FLOWER", None, "PRE-ROLL", "SOMETHING NEW"]
+        df = pd.DataFrame({"category_clean": pd.Series(raw, dtype=object).astype("category")})
+        result = normalize_categories(df)["category_clean"]
+        want = pd.Series(raw, dtype=object).replace(CATEGORY_NORMALIZATION)
+        self.assertEqual(result.astype(object).where(result.notna(), None).tolist(), want.tolist())
+        self.assertEqual(result.tolist()[:3], ["PRE ROLL", "CARTRIDGE", "FLOWER"])
+        self.assertEqual(sorted(result.cat.categories), ["CARTRIDGE", "FLOWER", "PRE ROLL", "SOMETHING NEW"])
+
+
+class CustomerSegmentsTest(unittest.TestCase):
+    def test_matches_scalar_version(self):
+        groups = pd.Series([
+            None, np.nan, "", "VIP", "vip senior",
+            # First keyword in CUSTOMER_SEGMENTS order wins, not the leftmost
+            "Senior, Employee", "Medical Local", "military veteran",
+            "Media team", "Book club",
+        ], dtype=object)
+        result = get_customer_segments(groups)
+        self.assertEqual(result.tolist(), [get_customer_segment(g) for g in groups])
+        self.assertEqual(result.tolist(), [
+            "Regular", "Regular", "Regular", "VIP", "Senior",
+            "Employee", "Medical", "Veteran", "Medical", "Other Group",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,282 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from app.data import store
+from app.data.schemas import PeriodFilter, PeriodType
+from tests.inbox import InboxTestCase, margin_report, sales_row
+
+
+def _month(year, month, n, **kw):
+    return [
+        sales_row(receipt=f"R{year}{month:02d}-{i}", when=f"{month:02d}/{i % 28 + 1:02d}/{year} 10:00:00 AM", **kw)
+        for i in range(n)
+    ]
+
+
+class SnapshotTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", _month(2025, 1, 6, brand="HAUS", category="Flower"))
+        margin_report(self.inbox, "2025-02-01", "2025-02-28", _month(2025, 2, 4))
+
+    def test_second_load_reuses_snapshot(self):
+        with mock.patch.dict(os.environ, {"THRIVE_CACHE": "1"}):
+            first = self.load().df
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                second = store.DataStore().load(self.inbox).df
+        self.assertIn("from snapshot cache", out.getvalue())
+        self.assertNotIn("could not write snapshot", out.getvalue())
+        pd.testing.assert_frame_equal(first, second, check_exact=True)
+
+    def test_year_month_round_trips_through_ordinals(self):
+        df = self.load().df
+        restored = store._ordinals_to_periods(store._periods_to_ordinals(df))
+        pd.testing.assert_series_equal(restored["year_month"], df["year_month"])
+
+    def test_changed_inbox_misses_snapshot(self):
+        with mock.patch.dict(os.environ, {"THRIVE_CACHE": "1"}):
+            self.load()
+            margin_report(self.inbox, "2025-03-01", "2025-03-31", _month(2025, 3, 3))
+            df = self.load().df
+        self.assertEqual(len(df), 13)
+        self.assertEqual(len(list((self.root / ".cache").glob("store-*"))), 1)
+
+
+class CacheInvalidationTest(InboxTestCase, unittest.TestCase):
+    """Row indexes cached by one frame must never answer for the next."""
+
+    JAN = PeriodFilter(period_type=PeriodType.MONTH, year=2025, month=1)
+    JAN_MAIN = PeriodFilter(period_type=PeriodType.MONTH, year=2025, month=1, store="Thrive Cannabis Main")
+
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", _month(2025, 1, 6, brand="HAUS"))
+        margin_report(self.inbox, "2025-02-01", "2025-02-28", _month(2025, 2, 4))
+        # Same months, different rows, stores and brands
+        self.other = self.root / "other"
+        self.other.mkdir()
+        margin_report(self.other, "2025-01-01", "2025-01-31", [
+            *_month(2025, 1, 3, brand="HAUS", store_name="Thrive Cannabis East - RD2"),
+            *_month(2025, 1, 5, brand="Wyld", revenue=50.0),
+        ])
+
+    def _filter(self, data_store):
+        return {
+            "jan": data_store.get_regular(self.JAN),
+            "jan_main": data_store.get_regular(self.JAN_MAIN),
+            "haus_jan": data_store.get_brand("haus", self.JAN),
+            "dates": data_store.date_range(self.JAN),
+            "margins": data_store.category_margin_lookup(self.JAN),
+            "brands": data_store.brands(),
+            "stores": data_store.stores(),
+        }
+
+    def _assert_same(self, got, want):
+        for name in want:
+            with self.subTest(name):
+                if isinstance(want[name], pd.DataFrame):
+                    pd.testing.assert_frame_equal(got[name], want[name])
+                else:
+                    self.assertEqual(got[name], want[name])
+
+    def test_reload_with_different_data_rebuilds_indexes(self):
+        reused = self.load()
+        before = self._filter(reused)
+        self.assertEqual(len(before["jan_main"]), 6)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reused.load(self.other)
+            fresh = store.DataStore().load(self.other)
+        after = self._filter(reused)
+        self._assert_same(after, self._filter(fresh))
+        self.assertEqual(len(after["jan"]), 8)
+        self.assertEqual(len(after["jan_main"]), 5)
+        self.assertEqual(len(after["haus_jan"]), 3)
+
+    def test_assigning_df_rebuilds_indexes(self):
+        data_store = self.load()
+        self._filter(data_store)
+        data_store.df = data_store.df[data_store.df["brand_clean"] != "HAUS"]
+        after = self._filter(data_store)
+        self.assertEqual(len(after["jan"]), 0)
+        self.assertTrue(after["haus_jan"].empty)
+        self.assertEqual(after["brands"], ["Wyld"])
+
+    def test_invalidate_after_in_place_mutation(self):
+        data_store = self.load()
+        self.assertEqual(len(data_store.get_regular(self.JAN)), 6)
+        tx = data_store.df["transaction_type"].astype(str)
+        tx[data_store.df["month"] == 1] = "REWARD"
+        data_store.df["transaction_type"] = tx.astype("category")
+        data_store.invalidate()
+        self.assertTrue(data_store.get_regular(self.JAN).empty)
+        self.assertTrue(data_store.get_brand("HAUS", self.JAN).empty)
+        self.assertEqual(data_store.regular_count(), 4)
+
+    def test_stale_computation_does_not_leak_into_new_frame(self):
+        data_store = self.load()
+        stale = data_store._memo
+        # A reader still holding the old memo finishes after a reload
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_store.load(self.other)
+        stale["brand_index"] = {"HAUS": [0, 1, 2, 3, 4, 5]}
+        self.assertEqual(len(data_store.get_brand("HAUS")), 3)
+
+
+class PeriodMemoTest(InboxTestCase, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", _month(2025, 1, 28))
+        self.data_store = self.load()
+
+    def _month(self, n):
+        return PeriodFilter(period_type=PeriodType.MONTH, year=2025 - n // 12, month=n % 12 + 1)
+
+    def test_per_period_results_are_bounded(self):
+        with mock.patch.object(store, "_PERIOD_RESULT_CACHE", 4), \
+                mock.patch.object(store, "_PERIOD_INDEX_CACHE", 2):
+            for n in range(20):
+                self.data_store.date_range(self._month(n))
+                self.data_store.category_margin_lookup(self._month(n))
+        memo = self.data_store._memo
+        self.assertEqual(len(memo["date_range"]), 4)
+        self.assertEqual(len(memo["category_margin"]), 4)
+        self.assertEqual(len(memo["period_index"]), 2)
+        # Keys are periods, not per-period entries in the memo itself
+        self.assertFalse(any(isinstance(k, tuple) for k in memo))
+
+    def test_evicted_period_is_recomputed(self):
+        with mock.patch.object(store, "_PERIOD_RESULT_CACHE", 1):
+            first = self.data_store.date_range(self._month(0))
+            self.assertEqual(self.data_store.date_range(self._month(1)), "N/A")
+            self.assertEqual(self.data_store.date_range(self._month(0)), first)
+        self.assertEqual(first, "2025-01-01 00:00:00 to 2025-01-28 00:00:00")
+        self.assertEqual(self.data_store.date_range(), first)
+
+
+def _reference_period(df, period):
+    """Boolean-mask period filter, as DataStore applied it before the row indexes."""
+    p = period
+    if p.period_type == PeriodType.MONTH:
+        df = df[(df["year"] == p.year) & (df["month"] == p.month)]
+    elif p.period_type == PeriodType.QUARTER:
+        m = (p.quarter - 1) * 3 + 1
+        df = df[(df["year"] == p.year) & df["month"].isin([m, m + 1, m + 2])]
+    elif p.period_type == PeriodType.RANGE:
+        ym = df["year"].astype("int32") * 100 + df["month"].astype("int32")
+        df = df[(ym >= p.start_year * 100 + p.start_month) & (ym <= p.end_year * 100 + p.end_month)]
+    elif p.period_type == PeriodType.YEAR:
+        df = df[df["year"] == p.year]
+    if p.store:
+        df = df[df["store_clean"] == p.store]
+    return df
+
+
+class QueryTest(InboxTestCase, unittest.TestCase):
+    """Indexed lookups against the plain boolean-mask answers."""
+
+    MAIN, EAST = "Thrive Cannabis Main", "Thrive Cannabis East"
+
+    def setUp(self):
+        super().setUp()
+        east = "Thrive Cannabis East - RD2"
+        margin_report(self.inbox, "2024-12-01", "2024-12-31", [
+            *_month(2024, 12, 4, brand="Cookies", category="Flower", revenue=30.0, cost=12.0),
+            *_month(2024, 12, 2, brand="Stiiizy", category="Pre-Roll", store_name=east),
+        ])
+        margin_report(self.inbox, "2025-01-01", "2025-01-31", [
+            *_month(2025, 1, 3, brand="STIIIZY", category="Preroll"),
+            # Regular at $0 (exit bags aren't comps)
+            *_month(2025, 1, 2, brand="Thrive", category="Accessory", product="Thrive Exit Bag",
+                    store_name=east, revenue=0.0, cost=0.0),
+            # Not regular: reward, and an excluded store
+            sales_row(receipt="RW", when="01/20/2025 10:00:00 AM", deals="Reward"),
+            sales_row(receipt="TC", when="01/21/2025 10:00:00 AM", store_name="Thrive Commerce", brand="Only Online"),
+        ])
+        margin_report(self.inbox, "2025-04-01", "2025-04-30", _month(2025, 4, 5, brand="Wyld", store_name=east))
+        self.data_store = self.load()
+        df = self.data_store.df
+        self.regular = df[df["transaction_type"] == "REGULAR"]
+
+    def _periods(self):
+        month, quarter, year, rng = PeriodType.MONTH, PeriodType.QUARTER, PeriodType.YEAR, PeriodType.RANGE
+        for store_name in (None, self.MAIN, self.EAST, "Nowhere"):
+            yield PeriodFilter(store=store_name)
+            yield PeriodFilter(period_type=month, year=2025, month=1, store=store_name)
+            yield PeriodFilter(period_type=month, year=2025, month=2, store=store_name)
+            yield PeriodFilter(period_type=quarter, year=2025, quarter=2, store=store_name)
+            yield PeriodFilter(period_type=year, year=2024, store=store_name)
+            yield PeriodFilter(period_type=rng, start_year=2024, start_month=12, end_year=2025, end_month=1, store=store_name)
+
+    def test_get_regular_matches_mask(self):
+        for period in self._periods():
+            with self.subTest(period=period):
+                pd.testing.assert_frame_equal(
+                    self.data_store.get_regular(period), _reference_period(self.regular, period)
+                )
+
+    def test_get_brand_matches_mask_case_insensitively(self):
+        upper = self.regular["brand_clean"].astype(str).str.upper()
+        for brand in ("stiiizy", "COOKIES", "Wyld", "Only Online", "missing"):
+            want_all = self.regular[upper == brand.upper()]
+            for period in self._periods():
+                with self.subTest(brand=brand, period=period):
+                    got = self.data_store.get_brand(brand, period)
+                    pd.testing.assert_frame_equal(got, _reference_period(want_all, period))
+        # "Stiiizy" and "STIIIZY" are one brand to get_brand
+        self.assertEqual(len(self.data_store.get_brand("Stiiizy")), 5)
+
+    def test_excluded_store_is_gone_from_every_categorical(self):
+        df = self.data_store.df
+        for col in store._CATEGORY_COLUMNS:
+            with self.subTest(col):
+                self.assertIsInstance(df[col].dtype, pd.CategoricalDtype)
+                # No label outlives its rows
+                self.assertEqual(set(df[col].cat.categories), set(df[col].dropna().unique()))
+        self.assertNotIn("Thrive Commerce", df["store_clean"].cat.categories)
+        self.assertNotIn("TC", df["receipt_id"].astype(str).tolist())
+
+    def test_metadata(self):
+        ds = self.data_store
+        self.assertEqual(ds.stores(), [self.EAST, self.MAIN])
+        # Revenue desc: Cookies 120, Wyld 100, STIIIZY 60, Stiiizy 40, Thrive 0
+        self.assertEqual(ds.brands(), ["Cookies", "Wyld", "STIIIZY", "Stiiizy", "Thrive"])
+        # Aliases normalised: Gummies -> EDIBLE, Pre-Roll / Preroll -> PRE ROLL
+        self.assertEqual(ds.categories(), ["ACCESSORY", "EDIBLE", "FLOWER", "PRE ROLL"])
+        self.assertEqual(ds.periods_available(), [
+            {"year": 2024, "month": 12, "label": "December 2024"},
+            {"year": 2025, "month": 1, "label": "January 2025"},
+            {"year": 2025, "month": 4, "label": "April 2025"},
+        ])
+        self.assertEqual(ds.date_range(), "2024-12-01 00:00:00 to 2025-04-05 00:00:00")
+        self.assertEqual(ds.row_count(), 17)
+        self.assertEqual(ds.regular_count(), 16)
+
+    def test_metadata_results_are_callers_own(self):
+        ds = self.data_store
+        for method in (ds.stores, ds.brands, ds.categories, ds.periods_available, ds.category_margin_lookup):
+            with self.subTest(method.__name__):
+                first = method()
+                want = list(first) if isinstance(first, list) else dict(first)
+                first.clear()
+                self.assertEqual(method(), want)
+        ds.periods_available()[0]["label"] = "changed"
+        self.assertEqual(ds.periods_available()[0]["label"], "December 2024")
+
+    def test_category_margins(self):
+        jan = PeriodFilter(period_type=PeriodType.MONTH, year=2025, month=1)
+        margins = self.data_store.category_margin_lookup()
+        # Zero revenue has no margin rather than a division error
+        self.assertTrue(np.isnan(margins.pop("ACCESSORY")))
+        self.assertEqual(margins, {"EDIBLE": 60.0, "FLOWER": 60.0, "PRE ROLL": 60.0})
+        self.assertEqual(set(self.data_store.category_margin_lookup(jan)), {"ACCESSORY", "PRE ROLL"})
+
+
+if __name__ == "__main__":
+    unittest.main()